@@ -0,0 +1,101 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from intents import tokenize, strip_suffix
+
+# Cache for Gemini answers (override limits with environment variables)
+ANSWER_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(6 * 3600)))
+ANSWER_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+# Questions whose answer depends on the moment they are asked are never cached
+DEFAULT_OPT_OUT = [
+    "jam", "pukul", "hari apa", "tanggal", "sekarang", "besok", "kemarin", "nanti",
+    "cuaca", "berita", "minggu ini", "bulan ini", "tahun ini",
+]
+OPT_OUT = [p.strip() for p in os.getenv("ANSWER_CACHE_OPT_OUT", ",".join(DEFAULT_OPT_OUT)).split(",") if p.strip()]
+
+# Words that make no difference to the answer ("dong", "ya", ...)
+FILLER_WORDS = {"dong", "ya", "yah", "sih", "nih", "deh", "kok", "tolong", "vocacare", "eh", "nah", "ah", "gitu"}
+
+
+# Function for the normalized form of a prompt: same question, same key
+def normalize_prompt(prompt):
+    tokens = [strip_suffix(t) for t in tokenize(prompt)]
+    return " ".join(t for t in tokens if t not in FILLER_WORDS)
+
+
+class AnswerCache:
+    """TTL + LRU cache of LLM answers keyed on the normalized prompt and a context fingerprint.
+
+    The fingerprint covers the user and the conversation context Gemini saw (summary plus recent
+    turns), so an answer is only reused where it was given, never in another user's session.
+    """
+
+    def __init__(self, ttl=ANSWER_TTL, max_entries=ANSWER_MAX_ENTRIES, opt_out=OPT_OUT):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._opt_out = [tuple(tokenize(p)) for p in opt_out]
+        self._entries = OrderedDict()  # key -> (expires_at, answer)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _is_time_sensitive(self, normalized):
+        tokens = normalized.split()
+        for phrase in self._opt_out:
+            n = len(phrase)
+            if any(tuple(tokens[i:i + n]) == phrase for i in range(len(tokens) - n + 1)):
+                return True
+        return False
+
+    # Returns the cache key, or None if the prompt must not be cached
+    def key(self, prompt, context="", user_id=None):
+        normalized = normalize_prompt(prompt)
+        if not normalized or self._is_time_sensitive(normalized):
+            return None
+        fingerprint = hashlib.sha1(f"{user_id}\n{context}".encode("utf-8")).hexdigest()
+        return f"{normalized}|{fingerprint}"
+
+    def get(self, prompt, context="", user_id=None):
+        key = self.key(prompt, context, user_id)
+        with self._lock:
+            if key is None:
+                self.bypassed += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, prompt, answer, context="", user_id=None):
+        key = self.key(prompt, context, user_id)
+        if key is None or not answer:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# Process-wide cache; entries are scoped per user and conversation context by their keys
+answer_cache = AnswerCache()
@@ -1,65 +1,42 @@
 import os
-import time
-import wave
-import pyaudio
-import numpy as np
-import matplotlib.pyplot as plt
 import streamlit as st
-import subprocess
 import datetime
-import pandas as pd
+import metrics
 
-# Import functions from voicebot.py
-from voicebot import generate_response, text_to_speech, speech_to_text
+# Page modules (voicebot.py, reminder.py, audio capture, pandas) are imported inside the page
+# functions, so a cold start only pays for the page that is actually opened.
 
-# Import reminder functions from reminder.py
-from reminder import set_reminder, play_reminder, log_reminder, download_log
-
-# Function for recording audio with live visualization
-def record_audio_with_visualization(filename="input.wav", duration=8):
-    p = pyaudio.PyAudio()
-    stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=1024)
+# Function for recording audio with live visualization; returns the spoken PCM (None if silent).
+# Capture runs on its own thread into a ring buffer; the UI only polls it at a fixed frame rate.
+def record_audio_with_visualization(duration=8, fps=10):
+    from vad import trim_silence
+    from audio_capture import CaptureThread, rms_envelope
+    from audio_io import pcm_to_wav, spill
 
     st.write("**\U0001F3A4 Rekaman dimulai... Silakan berbicara!**")
-    frames = []
-
-    # Setup matplotlib for real-time visualization
-    fig, ax = plt.subplots()
-    x = np.arange(0, 1024)
-    line, = ax.plot(x, np.random.rand(1024), '-', color="#DC143C")  # Soft red line
-    ax.set_ylim(-32768, 32767)
-    ax.set_xlim(0, 1024)
-    plt.title("Amplitudo Input Suara", fontsize=14, color="#0E1351")  # Elegant blue title
-    plt.xlabel("Sampel", fontsize=12, color="#6E74B9")  # Soft purple labels
-    plt.ylabel("Amplitudo", fontsize=12, color="#6E74B9")
-
-    # Display the plot in Streamlit
-    plot_placeholder = st.empty()  # Placeholder for dynamic plot
-
-    for _ in range(0, int(16000 / 1024 * duration)):
-        data = stream.read(1024, exception_on_overflow=False)
-        frames.append(data)
-
-        # Convert data to numpy array for audio data analysis
-        audio_data = np.frombuffer(data, dtype=np.int16)  # Convert to numpy array
 
-        # Update plot with new audio data
-        line.set_ydata(audio_data)
-        plot_placeholder.pyplot(fig)  # Dynamically update the plot
+    capture = CaptureThread(duration)  # stops early once the user falls silent
+    capture.start()
 
-        time.sleep(0.05)  # Small delay to simulate real-time update
+    # Display a downsampled loudness envelope of the last two seconds
+    plot_placeholder = st.empty()  # Placeholder for dynamic plot
+    while not capture.done.wait(1 / fps):
+        envelope = rms_envelope(capture.ring.latest(2 * 16000))
+        plot_placeholder.line_chart(envelope, height=150, use_container_width=True)
 
-    plt.close(fig)
+    capture.join()
+    if capture.error:
+        raise capture.error
+    if capture.overflows:
+        st.caption(f"\u26A0 {capture.overflows} potongan audio hilang saat merekam (perangkat kewalahan).")
 
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+    # Keep only the spoken part; report no speech so the STT call can be skipped
+    pcm = trim_silence(capture.pcm())
+    if not pcm:
+        return None
 
-    with wave.open(filename, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-        wf.setframerate(16000)
-        wf.writeframes(b''.join(frames))
+    spill(pcm_to_wav(pcm), ".wav", prefix="input")
+    return pcm
 
 # Function for the Home page
 def show_home():
@@ -77,20 +54,79 @@ def show_home():
 
 # Function for the Voice Interaction page
 def show_voicebot():
+    # Import functions from voicebot.py
+    from voicebot import generate_response, text_to_speech, speech_to_text, listen_streaming, listen_speculative, speak_response_stream, show_streamed_reply
+    from speculation import speculation_stats
+    from answer_cache import answer_cache
+    from audio_io import play_on_server, audio_mime, SERVER_PLAYBACK
+    import audio_device
+
+    audio_device.warm()  # open the microphone stream now, so recording starts on the first press
+
     st.title("\U0001F4E2 Voicebot")
     st.write("Klik tombol di bawah untuk memulai interaksi suara.")
 
+    streaming = st.checkbox("Mode cepat (pengenalan suara langsung)", value=True, key="streaming_stt")
+    streaming_reply = st.checkbox("Balasan bertahap (suara diputar sambil dijawab)", value=True, key="streaming_reply")
+    speculative = streaming and st.checkbox("Siapkan balasan selagi berbicara (spekulatif)", value=False, key="speculative_reply")
+    server_playback = st.checkbox("Putar juga di speaker server", value=SERVER_PLAYBACK, key="server_playback")
+
+    # Reminder times follow the user's own timezone
+    st.sidebar.selectbox(
+        "Zona waktu", ["Asia/Jakarta", "Asia/Makassar", "Asia/Jayapura"],
+        format_func=lambda tz: {"Asia/Jakarta": "WIB", "Asia/Makassar": "WITA", "Asia/Jayapura": "WIT"}[tz],
+        key="timezone",
+    )
+
+    # Show how often repeated questions skip Gemini
+    cache_stats = answer_cache.stats()
+    st.sidebar.caption(
+        f"Cache jawaban: {cache_stats['hit_rate']:.0%} hit "
+        f"({cache_stats['hits']} hit, {cache_stats['misses']} miss, {cache_stats['bypassed']} dilewati)"
+    )
+    # Show how often replies prepared from partial transcripts were used
+    spec_stats = speculation_stats.as_dict()
+    st.sidebar.caption(
+        f"Balasan spekulatif: {spec_stats['hit_rate']:.0%} terpakai, {spec_stats['waste_ratio']:.0%} terbuang "
+        f"({spec_stats['hits']} hit, {spec_stats['wasted']} terbuang dari {spec_stats['started']})"
+    )
+
     if st.button("\U0001F50A Mulai", key="start_voice"):
         st.write("\U0001F399 Silakan berbicara...")
-        record_audio_with_visualization("input.wav")  # Record and visualize the audio
-        user_input = speech_to_text("input.wav")  # Convert the audio to text
+        if speculative:
+            with metrics.span("turn_listen", mode="speculative"):
+                user_input, response_text, response_audio, _ = listen_speculative()
+            if user_input:
+                # The reply was prepared while the user was talking, so it can play right away
+                st.write(f"**Kamu berkata:** {user_input}")
+                st.write(f"**Balasan Vocacare:** {response_text}")
+                st.audio(response_audio, format=audio_mime(response_audio), autoplay=not server_playback)
+                with metrics.span("playback"):
+                    play_on_server(response_audio, server_playback)
+            else:
+                st.write("Tidak ada suara yang terdeteksi. Silakan coba lagi.")
+            return
+        if streaming:
+            with metrics.span("turn_listen", mode="streaming"):
+                user_input = listen_streaming()  # Recognize while the user is still talking
+        else:
+            with metrics.span("capture"):
+                pcm = record_audio_with_visualization()  # Record and visualize the audio (kept in memory)
+            user_input = speech_to_text(pcm)  # Convert the audio to text (skipped if silent)
 
         if user_input:
             st.write(f"**Kamu berkata:** {user_input}")
-            response_text = generate_response(user_input)
-            st.write(f"**Balasan Vocacare:** {response_text}")
-            audio_file = text_to_speech(response_text, filename="output.mp3")  # Generate TTS
-            st.audio(audio_file)  # Play the response audio
+            if streaming_reply:
+                # Each sentence is shown and played as soon as it is ready, while Gemini is still generating
+                show_streamed_reply(speak_response_stream(user_input), server_playback)
+            else:
+                response_text = generate_response(user_input)
+                st.write(f"**Balasan Vocacare:** {response_text}")
+                response_audio = text_to_speech(response_text)  # Generate TTS
+                st.audio(response_audio, format=audio_mime(response_audio), autoplay=not server_playback)  # Play the response audio
+                play_on_server(response_audio, server_playback)
+        else:
+            st.write("Tidak ada suara yang terdeteksi. Silakan coba lagi.")
 
 # Function for the SOS page
 def show_sos():
@@ -101,17 +137,35 @@ def show_sos():
     </div>
     """, unsafe_allow_html=True)
 
+    from sos import get_dispatcher
+
+    # Build the Twilio client and open its connection while the page is shown, not on the press
+    dispatcher = get_dispatcher()
+
     if st.button("\U0001F6A8 Kirim SOS", key="send_sos"):
         st.write("\U0001F4E8 Mengirimkan peringatan darurat... Harap tunggu!")
         try:
-            # Ensure the 'sos.py' script is in the correct location
-            subprocess.run(["python", "sos.py"], check=True)  # Run sos.py script
-            st.success("Peringatan darurat berhasil dikirim!")
+            results = dispatcher.dispatch()
         except Exception as e:
             st.error(f"Terjadi kesalahan: {e}")
+        else:
+            # Delivery status per contact
+            for result in results:
+                if result["status"] == "terkirim":
+                    st.success(f"Terkirim ke {result['to']}")
+                else:
+                    st.error(f"Gagal mengirim ke {result['to']} setelah {result['attempts']} percobaan: {result['error']}")
+            if any(result["status"] == "terkirim" for result in results):
+                st.success("Peringatan darurat berhasil dikirim!")
 
 # Function for the Reminder page
 def show_reminder():
+    # Import reminder functions from reminder.py
+    from reminder import set_reminder, cancel_reminder, start_scheduler, log_reminder, show_log
+    from scheduler_service import list_reminders
+
+    start_scheduler()
+
     st.title("\U0001F4CB Reminder - Pengingat Harian")
     st.write("""
     Fitur ini dirancang untuk membantu lansia mencatat dan mengingat aktivitas harian mereka.
@@ -122,53 +176,36 @@ def show_reminder():
     time_input = st.time_input("Pilih Waktu Pengingat", value=datetime.time(9, 0))  # default jam 9 pagi
     message = st.text_input("Pesan Pengingat (misal: Waktunya minum obat)")
 
+    # Pending reminders survive restarts, so seed the list from the scheduler's job store
     if 'reminders' not in st.session_state:
-        st.session_state.reminders = []
+        st.session_state.reminders = list_reminders()
 
-    # Add reminder button
+    # Add reminder button (adding the same reminder twice keeps a single job)
     if st.button("Tambah Pengingat"):
         if message:
             reminder_time = datetime.datetime.combine(datetime.date.today(), time_input)
-            time_to_wait = set_reminder(reminder_time, message)
-            st.session_state.reminders.append((reminder_time, message))
+            job_id = set_reminder(reminder_time, message)
+            if all(reminder[2] != job_id for reminder in st.session_state.reminders):
+                st.session_state.reminders.append((reminder_time, message, job_id))
             st.write(f"Pengingat ditambahkan untuk {reminder_time.strftime('%H:%M:%S')}.")
 
     # Displaying reminders with "Selesai" button
     if st.session_state.reminders:
         st.write("Daftar Pengingat Hari Ini:")
         for i, reminder in enumerate(st.session_state.reminders):
-            reminder_time, reminder_msg = reminder
+            reminder_time, reminder_msg, job_id = reminder
             col1, col2 = st.columns([0.8, 0.2])
             col1.write(f"{reminder_time.strftime('%H:%M:%S')}: {reminder_msg}")
 
             # Selesai button
             if col2.button("Selesai", key=f"done_{i}"):
-                # Ensure correct format for log_reminder
-                log_reminder({
-                    "Message": reminder_msg,
-                    "Status": "Selesai",
-                    "Time": reminder_time
-                })
+                log_reminder(reminder_msg, status="Selesai")
+                cancel_reminder(job_id)  # Don't ring for a reminder that is already done
                 st.session_state.reminders.remove(reminder)  # Remove completed reminder
                 st.write(f"Pengingat untuk {reminder_msg} pada {reminder_time.strftime('%H:%M:%S')} selesai.")
 
-    # Display logs
-    if 'log_entries' in st.session_state and st.session_state['log_entries']:
-        st.write("Log Pengingat:")
-        log_df = pd.DataFrame(st.session_state['log_entries'])
-        st.dataframe(log_df)  # Display log as a table
-
-        # Add button to download log as .xlsx file
-        log_file = download_log()
-        if log_file:
-            st.download_button(
-                label="Download Log Pengingat (.xlsx)",
-                data=log_file,
-                file_name="log_pengingat.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-    else:
-        st.write("Belum ada log pengingat.")
+    # Display logs (paginated; exports are cached until a new entry is logged)
+    show_log()
 
 # Sidebar for navigation
 st.sidebar.title("\U0001F5FA Menu")
@@ -184,3 +221,9 @@ elif page == "SOS":
     show_sos()
 elif page == "Reminder":
     show_reminder()
+
+# Optional latency panel (all sessions in this process); METRICS_PORT also serves /metrics
+metrics.serve()
+if st.sidebar.checkbox("Tampilkan panel latensi", key="latency_panel"):
+    st.sidebar.dataframe(metrics.metrics.summary(), hide_index=True)
+    st.sidebar.json(metrics.metrics.counters(), expanded=False)
@@ -0,0 +1,167 @@
+import os
+import time
+import asyncio
+import threading
+
+import phrase_bundle
+from tts_cache import get_cache, speech_key
+from clients import get_credentials, get_gemini_model
+from memory import get_session_memory
+from scheduler_service import current_user_id
+import voicebot
+
+# Per-stage timeouts in seconds (override with environment variables)
+STT_TIMEOUT = float(os.getenv("STT_TIMEOUT", "10"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "8"))
+
+# One voice turn runs as coroutines on a shared event loop: STT -> reply -> TTS, with the
+# reminder audio synthesized alongside instead of after the reply. Blocked RPCs cost no thread.
+
+
+class AsyncClients:
+    """Async Speech/TTS clients. They belong to the event loop they were created on."""
+
+    def __init__(self):
+        from google.cloud import speech
+        from google.cloud import texttospeech
+        credentials = get_credentials()
+        self.speech = speech.SpeechAsyncClient(credentials=credentials)
+        self.tts = texttospeech.TextToSpeechAsyncClient(credentials=credentials)
+
+
+# Function for speech-to-text without blocking the event loop
+async def speech_to_text_async(clients, pcm):
+    from google.cloud import speech
+    if not pcm:
+        return ""
+    content, config = voicebot.recognition_request(pcm)
+    audio = speech.RecognitionAudio(content=content)
+    response = await clients.speech.recognize(config=config, audio=audio)
+    if response.results:
+        return response.results[0].alternatives[0].transcript
+    return ""
+
+
+# Function for synthesizing through the phrase bundle and the TTS cache, awaiting the API on a miss
+async def synthesize_async(clients, text):
+    from google.cloud import texttospeech
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    voice = voicebot.voice_params()
+    audio_config = voicebot.audio_params()
+    key = speech_key(synthesis_input, voice, audio_config)
+
+    audio = phrase_bundle.lookup(key)
+    if audio is not None:
+        return bytes(audio)
+    cache = get_cache()
+    audio = cache.get(key)
+    if audio is None:
+        response = await clients.tts.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
+        audio = response.audio_content
+        cache.put(key, audio)
+    return audio
+
+
+# Function for the reply text: predefined/cached answers return at once, otherwise Gemini is awaited
+async def generate_response_async(prompt, memory, llm=None):
+    answer, context, history = voicebot.prepare_response(prompt, memory)
+    if answer is not None:
+        return answer
+    response = await (llm or get_gemini_model()).generate_content_async([voicebot.casual_prompt(context)])
+    return voicebot.finish_response(prompt, response.text.strip(), history, memory)
+
+
+# Function for the due reminders' text, audio and taken occurrences. If synthesis fails, times
+# out or the turn is cancelled, the reminders go back to the engine for the next turn.
+async def _reminder_audio(clients, user_id, timezone):
+    due = voicebot.take_reminders(user_id, timezone)
+    parts = voicebot.reminder_announcement(due, timezone)
+    if not parts:
+        return None, None, due
+    try:
+        clips = await asyncio.gather(*(synthesize_async(clients, part) for part in parts))
+    except BaseException:
+        voicebot.reminder_engine.restore(user_id, due)
+        raise
+    return " ".join(parts), b"".join(clips), due
+
+
+async def _await_reminder(reminder_task):
+    try:
+        return await reminder_task
+    except asyncio.TimeoutError:
+        return None, None, []  # never hold up the reply for the reminder
+
+
+# Function for one complete voice turn. Returns a dict with the transcript, reply, audio,
+# any due reminder and per-stage timings; a stage that times out raises asyncio.TimeoutError.
+async def voice_turn(clients, pcm, memory, user_id, timezone):
+    timings = {}
+    start = time.perf_counter()
+    response_text, audio = "", None
+
+    # The reminder does not depend on what the user says, so it is synthesized right away
+    reminder_task = asyncio.create_task(asyncio.wait_for(_reminder_audio(clients, user_id, timezone), TTS_TIMEOUT))
+    try:
+        transcript = await asyncio.wait_for(speech_to_text_async(clients, pcm), STT_TIMEOUT)
+        timings["stt"] = time.perf_counter() - start
+
+        if transcript:
+            stage = time.perf_counter()
+            response_text = await asyncio.wait_for(generate_response_async(transcript, memory), LLM_TIMEOUT)
+            timings["response"] = time.perf_counter() - stage
+
+            stage = time.perf_counter()
+            audio = await asyncio.wait_for(synthesize_async(clients, response_text), TTS_TIMEOUT)
+            timings["tts"] = time.perf_counter() - stage
+
+        # Reminders taken for this turn are delivered even when nothing was said
+        reminder, reminder_audio, _ = await _await_reminder(reminder_task)
+    except BaseException:
+        if reminder_task.done() and not reminder_task.cancelled() and reminder_task.exception() is None:
+            # Synthesized, but the turn failed before it could be shown: keep it for the next turn
+            voicebot.reminder_engine.restore(user_id, reminder_task.result()[2])
+        reminder_task.cancel()
+        raise
+
+    timings["total"] = time.perf_counter() - start
+    return {"transcript": transcript, "response": response_text, "audio": audio,
+            "reminder": reminder, "reminder_audio": reminder_audio, "timings": timings}
+
+
+class TurnRunner:
+    """A single background event loop that serves voice turns for every session."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="voice-turns", daemon=True)
+        self._thread.start()
+        self.clients = asyncio.run_coroutine_threadsafe(self._make_clients(), self.loop).result()
+
+    async def _make_clients(self):
+        return AsyncClients()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # Blocks the calling (Streamlit script) thread only; the loop keeps serving other sessions
+    def run_turn(self, pcm, memory=None):
+        memory = memory or get_session_memory()
+        # Session state is only readable on the script thread, so resolve it before handing off
+        user_id = current_user_id()
+        timezone = voicebot.user_timezone()
+        return self.submit(voice_turn(self.clients, pcm, memory, user_id, timezone)).result()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+# Function for the process-wide turn runner
+def get_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = TurnRunner()
+        return _runner
@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+from vad import Endpointer
+from audio_device import get_device
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+
+class RingBuffer:
+    """Preallocated int16 ring buffer written by the capture thread and read by the UI."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._lock = threading.Lock()
+        self.written = 0  # total samples ever written
+
+    def write(self, samples):
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+        with self._lock:
+            start = self.written % self.capacity
+            first = min(len(samples), self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:len(samples) - first] = samples[first:]
+            self.written += n
+
+    # Returns a copy of the most recent n samples (fewer if not yet written)
+    def latest(self, n):
+        with self._lock:
+            n = min(n, self.written, self.capacity)
+            end = self.written % self.capacity
+            if n <= end:
+                return self._data[end - n:end].copy()
+            return np.concatenate((self._data[self.capacity - (n - end):], self._data[:end]))
+
+
+# Function for a downsampled RMS envelope (one value per `points` bucket) for drawing
+def rms_envelope(samples, points=100):
+    if len(samples) < points:
+        return np.zeros(points, dtype=np.float32)
+    usable = len(samples) - len(samples) % points
+    buckets = samples[len(samples) - usable:].reshape(points, -1).astype(np.float32)
+    return np.sqrt(np.mean(buckets * buckets, axis=1))
+
+
+class CaptureThread(threading.Thread):
+    """Reads a lease on the shared microphone stream on its own thread, so rendering never
+    delays reading. `overflows` counts device overruns and chunks dropped during the recording."""
+
+    def __init__(self, duration=8, rate=SAMPLE_RATE, chunk=CHUNK):
+        super().__init__(daemon=True)
+        self.duration = duration
+        self.rate = rate
+        self.chunk = chunk
+        # Sized for the whole recording, so the final PCM can be taken from it without wrapping
+        self.ring = RingBuffer(int(rate * duration) + chunk)
+        self.endpointer = Endpointer(rate=rate)
+        self.overflows = 0
+        self.error = None
+        self.done = threading.Event()
+        self._stop_requested = threading.Event()
+
+    def run(self):
+        try:
+            with get_device().lease(preroll=True) as lease:
+                try:
+                    for _ in range(0, int(self.rate / self.chunk * self.duration)):
+                        if self._stop_requested.is_set():
+                            break
+                        data = lease.read()
+                        if data is None:
+                            raise IOError("No audio from the input device")
+                        self.ring.write(np.frombuffer(data, dtype=np.int16))
+                        if self.endpointer.push(data):
+                            break
+                finally:
+                    self.overflows = lease.overflows
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def stop(self):
+        self._stop_requested.set()
+
+    # Function for the full recording as raw PCM bytes
+    def pcm(self):
+        return self.ring.latest(self.ring.written).tobytes()
@@ -0,0 +1,169 @@
+import os
+import queue
+import threading
+from collections import deque
+import metrics
+
+# One PortAudio instance and one always-open input stream per process. The stream runs in
+# callback mode and fans every chunk out to the active capture leases, so pressing "record"
+# starts instantly and concurrent sessions share the microphone instead of racing to open it.
+# The stream is paused (not closed) after AUDIO_IDLE_SECONDS without a lease.
+SAMPLE_RATE = 16000
+CHUNK = 1024
+IDLE_SECONDS = float(os.getenv("AUDIO_IDLE_SECONDS", "300"))
+LEASE_QUEUE_CHUNKS = 64  # ~4 s of audio buffered per lease before the oldest chunks are dropped
+PREROLL_CHUNKS = 4
+
+
+class CaptureLease:
+    """One session's view of the shared input stream. Read chunks with read(); close when done."""
+
+    def __init__(self, device, preroll=()):
+        self.device = device
+        self._queue = queue.Queue(maxsize=LEASE_QUEUE_CHUNKS)
+        self.dropped = 0  # chunks lost because this reader fell behind
+        self.overflows_at_start = device.overflows
+        for chunk in preroll:
+            self._push(chunk)
+
+    def _push(self, chunk):
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()  # keep the newest audio
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            self._queue.put_nowait(chunk)
+
+    # Function for the next chunk of raw 16-bit PCM, or None if none arrived within `timeout`
+    def read(self, timeout=1.0):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    # Function for device overruns while this lease was open, plus chunks this reader dropped
+    @property
+    def overflows(self):
+        return self.device.overflows - self.overflows_at_start + self.dropped
+
+    def close(self):
+        self.device.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AudioDevice:
+    def __init__(self, rate=SAMPLE_RATE, chunk=CHUNK, idle_seconds=IDLE_SECONDS):
+        import pyaudio
+
+        self._pyaudio = pyaudio
+        self.rate = rate
+        self.chunk = chunk
+        self.idle_seconds = idle_seconds
+        self.overflows = 0  # input overruns reported by PortAudio
+        self.chunks = 0
+        self._leases = set()
+        self._preroll = deque(maxlen=PREROLL_CHUNKS)
+        self._lock = threading.Lock()        # leases and pre-roll, shared with the callback
+        self._state_lock = threading.Lock()  # starting/pausing; never held by the callback
+        self._idle_timer = None
+        with metrics.span("audio_device_open"):
+            self._audio = pyaudio.PyAudio()
+            self.stream = self._audio.open(format=pyaudio.paInt16, channels=1, rate=rate, input=True,
+                                           frames_per_buffer=chunk, stream_callback=self._callback)
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status & self._pyaudio.paInputOverflow:
+            self.overflows += 1
+            metrics.inc("audio_overflows")
+        self.chunks += 1
+        with self._lock:
+            self._preroll.append(in_data)
+            leases = list(self._leases)
+        for lease in leases:
+            lease._push(in_data)
+        return None, self._pyaudio.paContinue
+
+    # Function for a capture lease; with preroll, the last few chunks before the call come first
+    def lease(self, preroll=False):
+        with self._state_lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            if not self.stream.is_active():
+                self._preroll.clear()
+                self.stream.start_stream()
+            with self._lock:
+                lease = CaptureLease(self, list(self._preroll) if preroll else ())
+                self._leases.add(lease)
+        return lease
+
+    def release(self, lease):
+        with self._lock:
+            self._leases.discard(lease)
+        self.schedule_idle()
+
+    # Function for pausing the stream once nobody has leased it for idle_seconds
+    def schedule_idle(self):
+        with self._state_lock:
+            with self._lock:
+                idle = not self._leases
+            if idle and self._idle_timer is None:
+                self._idle_timer = threading.Timer(self.idle_seconds, self._pause_if_idle)
+                self._idle_timer.daemon = True
+                self._idle_timer.start()
+
+    def _pause_if_idle(self):
+        with self._state_lock:
+            self._idle_timer = None
+            with self._lock:
+                idle = not self._leases
+            # Stopping waits for a running callback, so it must happen outside self._lock
+            if idle and self.stream.is_active():
+                self.stream.stop_stream()
+
+    def stats(self):
+        with self._lock:
+            return {"active_leases": len(self._leases), "overflows": self.overflows, "chunks": self.chunks,
+                    "streaming": self.stream.is_active()}
+
+    def close(self):
+        with self._state_lock:
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+            self.stream.stop_stream()
+            self.stream.close()
+            self._audio.terminate()
+
+
+_device = None
+_device_lock = threading.Lock()
+
+
+# Function for the process-wide input device, opened on first use
+def get_device():
+    global _device
+    with _device_lock:
+        if _device is None:
+            _device = AudioDevice()
+            _device.schedule_idle()  # a warm stream nobody uses is paused again
+        return _device
+
+
+# Function for opening the device in the background (e.g. when the voice page is shown)
+def warm():
+    threading.Thread(target=_warm, name="audio-warm", daemon=True).start()
+
+
+def _warm():
+    try:
+        get_device()
+    except Exception as e:
+        print(f"Audio device unavailable: {e}")
@@ -0,0 +1,150 @@
+import io
+import os
+import uuid
+import wave
+import datetime
+
+# Audio normally stays in memory for the whole turn. Set VOCACARE_DEBUG_AUDIO_DIR to also
+# spill every captured/synthesized clip to disk (unique names, safe for concurrent sessions).
+DEBUG_AUDIO_DIR = os.getenv("VOCACARE_DEBUG_AUDIO_DIR")
+
+# Codec for speech-to-text uploads: "flac" (lossless, about half the size), "ogg_opus" (lossy,
+# a fraction of the size) or "linear16" (raw PCM). Compression needs the optional soundfile
+# package; without it uploads fall back to raw PCM.
+STT_CODEC = os.getenv("STT_CODEC", "flac").lower()
+CODECS = ("linear16", "flac", "ogg_opus")
+
+# Replies are played in the browser (st.audio). Playing them on the server's own speakers too is
+# opt-in: a headless or remote host has no audio device, and playsound blocks until the clip ends.
+SERVER_PLAYBACK = os.getenv("SERVER_PLAYBACK", "0") == "1"
+
+
+# Function for wrapping raw 16-bit mono PCM in a WAV container, in memory
+def pcm_to_wav(pcm, rate=16000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    return buffer.getvalue()
+
+
+# Function for the raw PCM inside WAV bytes (other bytes are assumed to be raw PCM already)
+def wav_to_pcm(data):
+    if data[:4] != b"RIFF":
+        return data
+    with wave.open(io.BytesIO(data), 'rb') as wf:
+        return wf.readframes(wf.getnframes())
+
+
+# Function for encoding 16-bit mono PCM for upload; returns (payload, codec actually used)
+def encode_pcm(pcm, codec=None, rate=16000):
+    codec = (codec or STT_CODEC).lower()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown STT codec: {codec} (expected one of {', '.join(CODECS)})")
+    if codec == "linear16":
+        return pcm, codec
+    try:
+        import numpy as np
+        import soundfile
+    except ImportError:
+        return pcm, "linear16"
+
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    buffer = io.BytesIO()
+    if codec == "flac":
+        soundfile.write(buffer, samples, rate, format="FLAC", subtype="PCM_16")
+    else:
+        soundfile.write(buffer, samples, rate, format="OGG", subtype="OPUS")
+    return buffer.getvalue(), codec
+
+
+# Function for decoding an encode_pcm payload back to 16-bit PCM (lossy for ogg_opus)
+def decode_audio(content, codec):
+    codec = codec.lower()
+    if codec == "linear16":
+        return bytes(content)
+    import soundfile
+
+    samples, _ = soundfile.read(io.BytesIO(content), dtype="int16")
+    return samples.tobytes()
+
+
+# Function for the container of a synthesized clip: "wav" (local voice) or "mp3" (cloud voice)
+def audio_format(audio):
+    return "wav" if bytes(audio[:4]) == b"RIFF" else "mp3"
+
+
+def audio_mime(audio):
+    return f"audio/{audio_format(audio)}"
+
+
+# Function for a clip's length in seconds: WAV from its header, MP3 through soundfile when it can
+# decode it, otherwise estimated from the 32 kbps bitrate of Text-to-Speech MP3s
+def clip_duration(audio):
+    audio = bytes(audio)
+    if audio_format(audio) == "wav":
+        with wave.open(io.BytesIO(audio), 'rb') as wf:
+            return wf.getnframes() / wf.getframerate()
+    try:
+        import soundfile
+        return soundfile.info(io.BytesIO(audio)).duration
+    except Exception:
+        return len(audio) * 8 / 32000
+
+
+# Function for joining clips into one: MP3 frames concatenate, WAV clips are merged into one
+# container. Returns None when cloud and local clips are mixed, since those can't be joined.
+def join_clips(clips):
+    clips = [bytes(clip) for clip in clips if clip]
+    formats = {audio_format(clip) for clip in clips}
+    if len(formats) > 1:
+        return None
+    if formats == {"wav"}:
+        with wave.open(io.BytesIO(clips[0]), 'rb') as wf:
+            rate = wf.getframerate()
+        return pcm_to_wav(b"".join(wav_to_pcm(clip) for clip in clips), rate)
+    return b"".join(clips)
+
+
+# Function for writing a clip to the debug directory (no-op unless debugging is enabled)
+def spill(data, suffix, prefix="vocacare"):
+    if not DEBUG_AUDIO_DIR:
+        return None
+    os.makedirs(DEBUG_AUDIO_DIR, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(DEBUG_AUDIO_DIR, f"{prefix}-{stamp}-{uuid.uuid4().hex[:8]}{suffix}")
+    with open(path, "wb") as out:
+        out.write(data)
+    return path
+
+
+# Function for playing in-memory audio on the server speakers. playsound only takes a path,
+# so the clip goes to a private temp file that is removed right after playback.
+def play_bytes(audio, suffix=None):
+    import tempfile
+    import playsound
+
+    suffix = suffix or f".{audio_format(audio)}"
+    spill(audio, suffix, prefix="playback")
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(audio)
+        path = tmp.name
+    try:
+        playsound.playsound(path)
+    finally:
+        os.remove(path)
+
+
+# Function for playing a clip on the server speakers when enabled (SERVER_PLAYBACK by default).
+# Playback errors are reported and ignored so they never abort a turn; returns whether it played.
+def play_on_server(audio, enabled=None):
+    if not (SERVER_PLAYBACK if enabled is None else enabled):
+        return False
+    try:
+        play_bytes(audio)
+    except Exception as e:
+        print(f"Server playback failed: {e}")
+        return False
+    return True
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import wave
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+# Batch mode: transcribe (and optionally answer) every WAV under a directory without Streamlit.
+# One JSON line per file is appended to the output as soon as that file is done, so the output
+# doubles as the checkpoint: a rerun skips files already recorded without an error.
+#
+#   python batch.py recordings/ --output results.jsonl --workers 4
+SYNC_LIMIT_SECONDS = 55  # recognize() accepts at most a minute of audio
+CHUNK_SECONDS = 50
+
+
+# Function for a WAV file as 16 kHz mono 16-bit PCM (other rates and channel counts are converted)
+def read_pcm(path, rate=16000):
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"Only 16-bit WAV is supported, got {wf.getsampwidth() * 8}-bit")
+        channels, source_rate = wf.getnchannels(), wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if source_rate != rate:
+        positions = np.arange(int(len(samples) * rate / source_rate)) * source_rate / rate
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype(np.int16).tobytes()
+
+
+# Function for the WAV files under a directory, in a stable order (paths relative to it)
+def find_wavs(directory, recursive=True):
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        found.extend(os.path.relpath(os.path.join(root, name), directory)
+                     for name in sorted(files) if name.lower().endswith(".wav"))
+        if not recursive:
+            break
+    return found
+
+
+# Function for the files already processed successfully according to the output file
+def completed_files(output):
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run; that file is redone
+            if not record.get("error"):
+                done.add(record["file"])
+    return done
+
+
+# Function for the transcript of one recording; long ones are chunked or sent to long_running_recognize
+def transcribe(pcm, long_mode="chunk", chunk_seconds=CHUNK_SECONDS):
+    import voicebot
+    from vad import split_at_pauses
+
+    seconds = len(pcm) / 32000
+    if seconds <= SYNC_LIMIT_SECONDS:
+        return voicebot.speech_to_text(pcm), 1
+    if long_mode == "long_running":
+        return voicebot.cloud_long_speech_to_text(pcm), 1
+    pieces = split_at_pauses(pcm, chunk_seconds)
+    texts = [voicebot.speech_to_text(piece) for piece in pieces]
+    return " ".join(text.strip() for text in texts if text.strip()), len(pieces)
+
+
+# Function for processing one file into its output record (errors are recorded, not raised)
+def process_file(directory, name, reply=True, long_mode="chunk"):
+    import voicebot
+    from memory import ConversationMemory
+
+    record = {"file": name}
+    try:
+        pcm = read_pcm(os.path.join(directory, name))
+        record["seconds"] = round(len(pcm) / 32000, 2)
+
+        start = time.perf_counter()
+        record["transcript"], record["chunks"] = transcribe(pcm, long_mode)
+        record["stt_seconds"] = round(time.perf_counter() - start, 3)
+
+        intent = voicebot.intent_matcher.match(record["transcript"]) if record["transcript"] else None
+        record["intent"] = intent["name"] if intent else None
+        if reply and record["transcript"]:
+            start = time.perf_counter()
+            # Every recording is answered as a fresh conversation
+            record["response"] = voicebot.generate_response(record["transcript"], ConversationMemory())
+            record["reply_seconds"] = round(time.perf_counter() - start, 3)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe and answer a directory of WAV recordings")
+    parser.add_argument("directory")
+    parser.add_argument("--output", default="batch_results.jsonl")
+    parser.add_argument("--workers", type=int, default=4, help="files processed at the same time")
+    parser.add_argument("--no-reply", action="store_true", help="only transcribe and match intents")
+    parser.add_argument("--no-recursive", action="store_true")
+    parser.add_argument("--long-mode", choices=["chunk", "long_running"], default="chunk",
+                        help="recordings over a minute: split at pauses, or use long_running_recognize")
+    parser.add_argument("--redo", action="store_true", help="ignore the checkpoint and process every file")
+    args = parser.parse_args()
+
+    files = find_wavs(args.directory, recursive=not args.no_recursive)
+    done = set() if args.redo else completed_files(args.output)
+    todo = [name for name in files if name not in done]
+    print(f"{len(files)} recordings, {len(files) - len(todo)} already done, {len(todo)} to process")
+
+    failed = 0
+    with open(args.output, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        pending, names = set(), iter(todo)
+        while True:
+            # Keep a bounded number of files in flight, so huge archives don't queue up in memory
+            for name in names:
+                pending.add(pool.submit(process_file, args.directory, name, not args.no_reply, args.long_mode))
+                if len(pending) >= args.workers * 2:
+                    break
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                failed += bool(record.get("error"))
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())  # a record on disk is a checkpoint that survives a crash
+                print(f"{record['file']}: {record.get('error') or record.get('transcript', '')}")
+
+    print(f"Done: {len(todo) - failed} processed, {failed} failed (rerun to retry them)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+import argparse
+import tempfile
+import statistics
+from audio_io import CODECS, encode_pcm
+from bench_pipeline import make_fixtures, load_fixtures
+
+# Codec benchmark for speech-to-text uploads: payload size, encode time and round trip per codec.
+# The round trip is simulated from the uplink bandwidth and RTT (weak mobile links by default);
+# with --live each payload is also sent to Google Speech-to-Text and the real round trip is timed.
+# Generated fixtures are noise and compress far worse than speech: pass --fixtures for real numbers.
+
+
+# Function for the simulated round trip of one upload: encode + transfer + RTT + recognition
+def simulated_round_trip(payload_bytes, encode_seconds, uplink_kbps, rtt, recognize):
+    return encode_seconds + payload_bytes * 8 / (uplink_kbps * 1000) + rtt + recognize
+
+
+# Function for timing a real recognize call with the given payload
+def live_round_trip(content, codec):
+    from google.cloud import speech
+    from clients import get_speech_client
+    from voicebot import recognition_config
+
+    start = time.perf_counter()
+    response = get_speech_client().recognize(config=recognition_config(codec), audio=speech.RecognitionAudio(content=content))
+    seconds = time.perf_counter() - start
+    transcript = response.results[0].alternatives[0].transcript if response.results else ""
+    return seconds, transcript
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speech-to-text upload codecs")
+    parser.add_argument("--fixtures", help="directory of 16 kHz mono .wav files")
+    parser.add_argument("--codecs", default=",".join(CODECS))
+    parser.add_argument("--runs", type=int, default=5, help="encodes per fixture and codec")
+    parser.add_argument("--uplink-kbps", type=float, default=256.0, help="simulated uplink bandwidth")
+    parser.add_argument("--rtt", type=float, default=0.15, help="simulated network round trip (s)")
+    parser.add_argument("--recognize", type=float, default=0.3, help="simulated server-side recognition time (s)")
+    parser.add_argument("--live", action="store_true", help="also call Google Speech-to-Text (needs credentials)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures or make_fixtures(tempfile.mkdtemp(prefix="vocacare-codecs-")))
+    raw_bytes = sum(len(pcm) for pcm, _ in fixtures)
+    audio_seconds = raw_bytes / 32000
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f} s of audio, uplink {args.uplink_kbps:.0f} kbps, RTT {args.rtt * 1000:.0f} ms")
+    print(f"{'codec':<10}{'bytes':>10}{'ratio':>8}{'encode ms':>11}{'sim. RTT ms':>13}" + (f"{'live ms':>10}" if args.live else ""))
+
+    for requested in args.codecs.split(","):
+        sizes, encode_times, round_trips, live_times = [], [], [], []
+        codec = requested
+        for pcm, _ in fixtures:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                content, codec = encode_pcm(pcm, requested)
+                encode_times.append(time.perf_counter() - start)
+            sizes.append(len(content))
+            round_trips.append(simulated_round_trip(len(content), statistics.median(encode_times[-args.runs:]),
+                                                    args.uplink_kbps, args.rtt, args.recognize))
+            if args.live:
+                live_times.append(live_round_trip(content, codec)[0])
+
+        label = requested if codec == requested else f"{requested}->{codec}"  # soundfile missing
+        line = (f"{label:<10}{sum(sizes):>10}{sum(sizes) / raw_bytes:>8.2f}"
+                f"{statistics.median(encode_times) * 1000:>11.1f}{statistics.median(round_trips) * 1000:>13.1f}")
+        if args.live:
+            line += f"{statistics.median(live_times) * 1000:>10.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import time
+import argparse
+import statistics
+from fakes import FakeLLM, FakeTTS
+from streaming_reply import split_sentences, pipelined_speech, stream_text
+
+# Offline benchmark: time-to-first-audio for a Gemini reply, whole-reply TTS vs sentence pipelining.
+
+REPLY = (
+    "Wah, pertanyaan yang bagus sekali. Biasanya orang seusia kita butuh tidur sekitar tujuh jam setiap malam. "
+    "Coba tidur dan bangun di jam yang sama setiap hari ya. Hindari minum kopi setelah sore hari. "
+    "Kalau masih susah tidur, ceritakan ke dokter supaya bisa dicarikan jalan keluarnya."
+)
+
+
+# Function for the old path: wait for the full answer, then synthesize it in one call
+def batch_turn(llm, tts):
+    start = time.perf_counter()
+    answer = llm.generate_content(["prompt"]).text
+    tts.synthesize(answer)
+    return time.perf_counter() - start
+
+
+# Function for the streamed path: first sentence audio while the rest is still generating
+def streamed_turn(llm, tts):
+    start = time.perf_counter()
+    first_audio = None
+    for _sentence, _audio in pipelined_speech(split_sentences(stream_text(llm, "prompt")), tts.synthesize):
+        if first_audio is None:
+            first_audio = time.perf_counter() - start
+    return first_audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-audio with fake Gemini/TTS")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--first-token", type=float, default=0.5, help="LLM first-token latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    parser.add_argument("--tts-base", type=float, default=0.15, help="TTS fixed latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {"batch": [], "streamed": []}
+    for run in range(args.runs):
+        llm = FakeLLM(REPLY, args.first_token, args.tokens_per_second, args.jitter, seed=run)
+        tts = FakeTTS(args.tts_base, jitter=args.jitter, seed=run)
+        results["batch"].append(batch_turn(llm, tts))
+        results["streamed"].append(streamed_turn(llm, tts))
+
+    for name, times in results.items():
+        print(f"{name:>9}: time to first audio median {statistics.median(times) * 1000:7.1f} ms "
+              f"(min {min(times) * 1000:.1f}, max {max(times) * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    main()
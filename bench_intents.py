@@ -0,0 +1,72 @@
+import time
+import random
+import argparse
+from intents import IntentMatcher
+
+# Micro-benchmark: intent matching time as the intent table grows.
+# Compares the compiled phrase-table matcher against the old linear `keyword in prompt` scan.
+
+PROMPTS = [
+    "halo vocacare apa kabar",
+    "aku lagi bosan banget nih hari ini",
+    "sudah waktunya minum obatnya belum ya",
+    "ceritakan sesuatu yang lucu dong",
+    "aku merasa kesepian banget di rumah sendirian",
+    "hari ini cuacanya bagaimana",
+    "aku kecapekan habis jalan pagi",
+    "kesepiannya terasa sekali malam ini",
+]
+
+
+# Function for a synthetic table: the real intents plus `size` generated ones
+def synthetic_intents(size, seed=0):
+    rng = random.Random(seed)
+    base = IntentMatcher.from_file().intents
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    generated = []
+    for i in range(size):
+        words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(5, 9))) for _ in range(3)]
+        generated.append({
+            "name": f"intent{i}",
+            "priority": rng.randint(-5, 5),
+            "synonyms": [words[0], f"{words[1]} {words[2]}"],
+            "response": f"Jawaban {i}",
+        })
+    return generated + base
+
+
+# Function for the pre-matcher behaviour, for comparison
+def linear_match(table, prompt):
+    lowered = prompt.lower()
+    for intent in table:
+        for keyword in [intent["name"]] + intent["synonyms"]:
+            if keyword in lowered:
+                return intent
+    return None
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for prompt in PROMPTS:
+            fn(prompt)
+    return (time.perf_counter() - start) / (repeat * len(PROMPTS)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent matching against table size")
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'intents':>8} {'matcher us':>11} {'linear us':>10}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        table = synthetic_intents(size)
+        matcher = IntentMatcher(table)
+        compiled = time_per_call(matcher.match, args.repeat)
+        linear = time_per_call(lambda p: linear_match(table, p), max(1, args.repeat // 10))
+        print(f"{len(table):>8} {compiled:>11.2f} {linear:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import glob
+import time
+import wave
+import datetime
+import random
+import argparse
+import tempfile
+import statistics
+import threading
+from collections import defaultdict
+
+# End-to-end benchmark of a voice turn (speech_to_text -> generate_response -> text_to_speech,
+# plus the reminder path) against the offline fakes, at 1..N concurrent simulated sessions.
+# Audio comes from WAV fixtures (16 kHz mono, transcript in a .txt next to each .wav); without
+# --fixtures a small set is generated. Reports p50/p95/p99 per stage and per turn.
+
+STAGES = ["stt", "response", "tts", "reminder", "total"]
+
+DEFAULT_FIXTURES = [
+    ("halo vocacare", 1.5),
+    ("saya sudah minum obat", 2.0),
+    ("bagaimana cara supaya tidur nyenyak", 3.0),
+    ("ceritakan tentang cuaca hari ini", 2.5),
+]
+
+REPLY = (
+    "Wah, pertanyaan yang bagus sekali. Coba tidur dan bangun di jam yang sama setiap hari ya. "
+    "Kalau masih susah, ceritakan ke dokter supaya bisa dicarikan jalan keluarnya."
+)
+
+
+class NullTTSCache:
+    """Cache that never hits, for measuring every turn with cold caches."""
+
+    def get(self, key):
+        return None
+
+    def put(self, key, audio):
+        pass
+
+
+# Function for writing the default fixtures (low noise standing in for speech)
+def make_fixtures(directory, seed=0):
+    rng = random.Random(seed)
+    for i, (transcript, seconds) in enumerate(DEFAULT_FIXTURES):
+        path = os.path.join(directory, f"turn{i}.wav")
+        frames = bytearray()
+        for _ in range(int(16000 * seconds)):
+            frames += rng.randint(-800, 800).to_bytes(2, "little", signed=True)
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(bytes(frames))
+        with open(path[:-4] + ".txt", "w", encoding="utf-8") as f:
+            f.write(transcript)
+    return directory
+
+
+# Function for loading fixtures as (pcm, transcript) pairs
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        with wave.open(path, "rb") as wf:
+            pcm = wf.readframes(wf.getnframes())
+        transcript_path = path[:-4] + ".txt"
+        transcript = ""
+        if os.path.exists(transcript_path):
+            with open(transcript_path, encoding="utf-8") as f:
+                transcript = f.read().strip()
+        fixtures.append((pcm, transcript))
+    if not fixtures:
+        raise SystemExit(f"No .wav fixtures in {directory}")
+    return fixtures
+
+
+# Function for looking up a fixture's transcript from the PCM the fake STT decoded. Lossy codecs
+# (ogg_opus) don't give the exact samples back, so the fixture closest in length is used then.
+def fixture_transcripts(fixtures):
+    transcripts = {pcm: transcript for pcm, transcript in fixtures}
+
+    def lookup(pcm):
+        if pcm in transcripts:
+            return transcripts[pcm]
+        return min(fixtures, key=lambda fixture: abs(len(fixture[0]) - len(pcm)))[1]
+    return lookup
+
+
+# Function for percentiles (p50, p95, p99) of a list of seconds
+def percentiles(samples):
+    if len(samples) < 2:
+        return samples * 3 if samples else [float("nan")] * 3
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+# Function for running one simulated session: `turns` voice turns one after another
+def run_session(voicebot, session, fixtures, turns, reminder_every, timings, lock):
+    from memory import ConversationMemory
+    from recurrence import Rule
+
+    user_id = f"bench-{session}"
+    memory = ConversationMemory()
+    for turn in range(turns):
+        pcm, _ = fixtures[(session + turn) % len(fixtures)]
+        if reminder_every and turn % reminder_every == 0:
+            # Make a reminder due for this turn, as if its time had just passed
+            rule = Rule(f"{user_id}:bench", user_id, "Waktunya minum air putih.", "every", every_hours=2)
+            voicebot.reminder_engine.inbox[user_id].append((datetime.datetime.now(datetime.timezone.utc), rule))
+
+        stage_times = {}
+        start = time.perf_counter()
+        transcript = voicebot.speech_to_text(pcm)
+        stage_times["stt"] = time.perf_counter() - start
+
+        stage = time.perf_counter()
+        response = voicebot.generate_response(transcript, memory)
+        stage_times["response"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        voicebot.text_to_speech(response)
+        stage_times["tts"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        parts = voicebot.reminder_parts(user_id)
+        if parts:
+            voicebot.text_to_speech_parts(parts)
+        stage_times["reminder"] = time.perf_counter() - stage
+        stage_times["total"] = time.perf_counter() - start
+
+        with lock:
+            for name, seconds in stage_times.items():
+                timings[name].append(seconds)
+
+
+# Function for running `sessions` sessions concurrently; returns stage timings and wall time
+def run_level(voicebot, sessions, fixtures, turns, reminder_every):
+    timings = defaultdict(list)
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_session, args=(voicebot, s, fixtures, turns, reminder_every, timings, lock))
+        for s in range(sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings, time.perf_counter() - start
+
+
+def report(sessions, timings, wall):
+    turns = len(timings["total"])
+    print(f"\n{sessions} session(s), {turns} turns, {turns / wall:.1f} turns/s")
+    print(f"  {'stage':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in STAGES:
+        p50, p95, p99 = percentiles(timings[name])
+        print(f"  {name:<10}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage voice turn latency with fake STT/Gemini/TTS")
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=10, help="turns per session")
+    parser.add_argument("--fixtures", help="directory of 16 kHz mono .wav files with .txt transcripts")
+    parser.add_argument("--stt-latency", type=float, default=0.2, help="STT fixed latency (s)")
+    parser.add_argument("--stt-per-second", type=float, default=0.1, help="STT latency per second of audio (s)")
+    parser.add_argument("--first-token", type=float, default=0.5, help="LLM first-token latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0)
+    parser.add_argument("--tts-base", type=float, default=0.15, help="TTS fixed latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--reminder-every", type=int, default=3, help="a reminder is due every N turns (0: never)")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the answer and TTS caches (default: cold)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="vocacare-bench-")
+    os.environ.setdefault("TTS_CACHE_DIR", os.path.join(workdir, "tts_cache"))
+    os.environ.setdefault("PHRASE_BUNDLE_PATH", os.path.join(workdir, "none.bundle"))
+
+    import voicebot
+    import tts_cache
+    from answer_cache import AnswerCache
+    from fakes import FakeSpeechClient, FakeLLM, FakeTTS
+
+    fixtures = load_fixtures(args.fixtures or make_fixtures(workdir, args.seed))
+    speech = FakeSpeechClient(fixture_transcripts(fixtures), latency=args.stt_latency, per_audio_second=args.stt_per_second,
+                              jitter=args.jitter, seed=args.seed)
+    llm = FakeLLM(REPLY, args.first_token, args.tokens_per_second, args.jitter, seed=args.seed)
+    tts = FakeTTS(args.tts_base, jitter=args.jitter, seed=args.seed)
+    voicebot.get_speech_client = lambda: speech
+    voicebot.get_gemini_model = lambda: llm
+    voicebot.get_tts_client = lambda: tts
+    if not args.warm_cache:
+        voicebot.answer_cache = AnswerCache(max_entries=0)
+        tts_cache._default_cache = NullTTSCache()
+
+    print(f"{len(fixtures)} fixtures, {args.turns} turns per session, "
+          f"{'warm' if args.warm_cache else 'cold'} caches, jitter {args.jitter:.0%}")
+    for sessions in (int(level) for level in args.sessions.split(",")):
+        timings, wall = run_level(voicebot, sessions, fixtures, args.turns, args.reminder_every)
+        report(sessions, timings, wall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import time
+import random
+import argparse
+import datetime
+from recurrence import Rule, RecurrenceEngine, UTC
+
+# Benchmark: cost of scheduling and firing recurring reminders as the rule count grows.
+# With the min-heap, add and pop are O(log n), so per-operation time should barely move
+# between 1k and 100k rules.
+
+TIMEZONES = ["Asia/Jakarta", "Asia/Makassar", "Asia/Jayapura", "Europe/Amsterdam", "America/New_York"]
+
+
+# Function for a random mix of daily, weekly and every-N-hours rules
+def random_rules(count, seed=0):
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        kind = rng.choice(["daily", "weekly", "every"])
+        rules.append(Rule(
+            f"rule{i}", f"user{i % 5000}", "Waktunya minum obat", kind,
+            hour=rng.randrange(24), minute=rng.randrange(60),
+            weekdays=rng.sample(range(7), rng.randint(1, 3)),
+            every_hours=rng.choice([1, 2, 3, 4, 6, 8]),
+            timezone=rng.choice(TIMEZONES),
+        ))
+    return rules
+
+
+def bench(count):
+    start_time = datetime.datetime(2026, 1, 5, tzinfo=UTC)
+    engine = RecurrenceEngine()
+    rules = random_rules(count)
+
+    start = time.perf_counter()
+    for rule in rules:
+        engine.add(rule, now=start_time)
+    add_us = (time.perf_counter() - start) / count * 1e6
+
+    # Advance a simulated clock one minute at a time for six hours
+    fired = 0
+    start = time.perf_counter()
+    now = start_time
+    for _ in range(6 * 60):
+        now += datetime.timedelta(minutes=1)
+        fired += len(engine.due(now))
+    elapsed = time.perf_counter() - start
+    fire_us = elapsed / max(fired, 1) * 1e6
+
+    # Checking when nothing is due must not depend on n at all
+    start = time.perf_counter()
+    for _ in range(10000):
+        engine.due(now)
+    idle_us = (time.perf_counter() - start) / 10000 * 1e6
+    return add_us, fired, fire_us, idle_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recurring reminder engine")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    print(f"{'rules':>8} {'add us':>8} {'fired':>8} {'us/fire':>8} {'idle us':>8}")
+    for count in [int(s) for s in args.sizes.split(",")]:
+        add_us, fired, fire_us, idle_us = bench(count)
+        print(f"{count:>8} {add_us:>8.2f} {fired:>8} {fire_us:>8.2f} {idle_us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
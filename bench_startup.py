@@ -0,0 +1,62 @@
+import sys
+import argparse
+import statistics
+import subprocess
+
+# Startup benchmark: cold import time of the app modules and first-render latency of apps.py.
+# Every measurement runs in a fresh interpreter so module caches don't hide the cost.
+
+MODULES = ["clients", "voicebot", "reminder", "checklist", "apps"]
+
+_IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+_RENDER_SNIPPET = """
+import time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file("apps.py", default_timeout=60)
+app.run()
+print(time.perf_counter() - start)
+"""
+
+
+# Function for running a snippet in a new interpreter and returning the seconds it printed
+def run_fresh(snippet):
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def report(name, samples):
+    print(f"{name:<22} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and first-render latency")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--no-render", action="store_true", help="skip the AppTest first-render measurement")
+    args = parser.parse_args()
+
+    for module in args.modules.split(","):
+        try:
+            report(f"import {module}", [run_fresh(_IMPORT_SNIPPET.format(module=module)) for _ in range(args.runs)])
+        except RuntimeError as e:
+            print(f"import {module:<15} skipped: {e}")
+
+    if not args.no_render:
+        try:
+            report("first render apps.py", [run_fresh(_RENDER_SNIPPET) for _ in range(args.runs)])
+        except RuntimeError as e:
+            print(f"first render apps.py   skipped: {e}")
+
+
+if __name__ == "__main__":
+    main()
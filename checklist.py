@@ -1,29 +1,20 @@
-import os
 import streamlit as st
-from twilio.rest import Client
+from outbox import get_outbox
+from scheduler_service import current_user_id
+import metrics
 
-# Twilio configuration (use environment variables for security)
-account_sid = os.getenv("account_sid")
-auth_token = os.getenv("auth_token")
-twilio_client = Client(account_sid, auth_token)
-
-# Function to send WhatsApp message
-def send_whatsapp_message(to_number, completed_items):
-    try:
-        message_body = (
-            "Halo! Berikut adalah aktivitas yang telah Anda selesaikan hari ini:\n\n"
-            + "\n".join([f"- {item}" for item in completed_items])
-            + "\n\nTetap semangat dan sehat selalu! 😊"
-        )
-
-        message = twilio_client.messages.create(
-            from_='whatsapp:+14155238886',  # Twilio WhatsApp Sandbox number
-            body=message_body,
-            to=f'whatsapp:{to_number}'
-        )
-        return message.sid
-    except Exception as e:
-        return f"Terjadi kesalahan saat mengirim pesan: {e}"
+# Function to queue the WhatsApp message; the outbox worker sends it (Twilio credentials from
+# the environment). Saves by the same user to the same number within the coalescing window
+# become one message.
+def send_whatsapp_message(to_number, completed_items, user_id=None):
+    user_id = user_id or current_user_id()
+    message_body = (
+        "Halo! Berikut adalah aktivitas yang telah Anda selesaikan hari ini:\n\n"
+        + "\n".join([f"- {item}" for item in completed_items])
+        + "\n\nTetap semangat dan sehat selalu! 😊"
+    )
+    with metrics.span("outbox_enqueue", channel="checklist"):
+        return get_outbox().enqueue(user_id, to_number, message_body, coalesce_key=f"checklist:{user_id}:{to_number}")
 
 # Function for the Checklist Reminder page
 def show_checklist():
@@ -61,11 +52,17 @@ def show_checklist():
         if completed_items:
             st.success(f"Checklist tersimpan! Aktivitas selesai: {', '.join(completed_items)}")
 
-            # Send WhatsApp message
-            message_sid = send_whatsapp_message(phone_number, completed_items)
-            if "SM" in message_sid:  # Check if the message SID is valid
-                st.success("Pesan WhatsApp berhasil dikirim!")
-            else:
-                st.error(message_sid)  # Display error message
+            # Queue the WhatsApp message (returns at once; sent in the background)
+            st.session_state.checklist_message_id = send_whatsapp_message(phone_number, completed_items)
+            st.info("Pesan WhatsApp dijadwalkan untuk dikirim.")
         else:
             st.warning("Tidak ada aktivitas yang ditandai selesai.")
+
+    # Delivery status of the last queued message
+    message_id = st.session_state.get("checklist_message_id")
+    if message_id:
+        state = get_outbox().status(message_id)
+        if state and state["status"] == "sent":
+            st.success("Pesan WhatsApp berhasil dikirim!")
+        elif state and state["status"] == "failed":
+            st.error(f"Terjadi kesalahan saat mengirim pesan: {state['error']}")
@@ -0,0 +1,70 @@
+import os
+import streamlit as st
+from dotenv import load_dotenv
+
+# Cloud clients are created on first use and shared by every session in the process
+# (st.cache_resource), so importing a page never pays for credentials or gRPC channels.
+
+# Load environment variables
+load_dotenv()
+
+# API Keys and Credentials
+GOOGLE_API_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "new.json")
+GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+
+
+@st.cache_resource(show_spinner=False)
+def get_credentials():
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(GOOGLE_API_CREDENTIALS)
+
+
+# Setup for Google Speech-to-Text (STT)
+@st.cache_resource(show_spinner=False)
+def get_speech_client():
+    from google.cloud import speech
+    return speech.SpeechClient(credentials=get_credentials())
+
+
+# Setup for Google Text-to-Speech (TTS)
+@st.cache_resource(show_spinner=False)
+def get_tts_client():
+    from google.cloud import texttospeech
+    return texttospeech.TextToSpeechClient(credentials=get_credentials())
+
+
+# Setup for Gemini (NLP)
+@st.cache_resource(show_spinner=False)
+def get_gemini_model():
+    import google.generativeai as genai
+    from google.generativeai.types import generation_types
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    generation_config = generation_types.GenerationConfig(
+        temperature=0.7, top_p=0.9, top_k=50, max_output_tokens=1024
+    )
+    return genai.GenerativeModel(model_name=GEMINI_MODEL_NAME, generation_config=generation_config)
+
+
+# Setup for Twilio (WhatsApp). Not cached: each owner (SOS, outbox) keeps its own connection pool.
+# base_url points the client at another Messages API, e.g. fakes.FakeTwilioServer.
+def make_twilio_client(account_sid=None, auth_token=None, pool_size=8, timeout=10, base_url=None):
+    from requests.adapters import HTTPAdapter
+    from twilio.rest import Client
+    from twilio.http.http_client import TwilioHttpClient
+
+    http_client = TwilioHttpClient(timeout=timeout)
+    # Keep-alive connections, reused across sends
+    for prefix in ("https://", "http://"):
+        http_client.session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    client = Client(account_sid or os.getenv("account_sid"), auth_token or os.getenv("auth_token"),
+                    http_client=http_client)
+    if base_url:
+        client.api.base_url = base_url
+    return client
+
+
+# Function for whether a failed Twilio send is worth retrying (throttling, server errors, network errors)
+def is_retryable(error):
+    status = getattr(error, "status", None)
+    return status is None or status == 429 or status >= 500
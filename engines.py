@@ -0,0 +1,190 @@
+import os
+import io
+import json
+import wave
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import metrics
+
+# Speech engines behind speech_to_text and text_to_speech. An STT engine has recognize(pcm) -> text,
+# a TTS engine has synthesize(text) -> audio bytes (MP3 from Google, WAV from the local voice).
+# "hedged" asks Google first and, if it hasn't answered within the latency budget (or fails),
+# also runs the local engine and takes whichever answers first. Without a local engine installed
+# (vosk + a model, pyttsx3 + espeak) hedging quietly falls back to Google only.
+STT_ENGINE = os.getenv("STT_ENGINE", "hedged")  # google | local | hedged
+TTS_ENGINE = os.getenv("TTS_ENGINE", "hedged")
+STT_HEDGE_BUDGET = float(os.getenv("STT_HEDGE_BUDGET", "3"))
+TTS_HEDGE_BUDGET = float(os.getenv("TTS_HEDGE_BUDGET", "2"))
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-id")
+LOCAL_TTS_VOICE = os.getenv("LOCAL_TTS_VOICE", "indonesian")
+# Deadlines for the Google calls; transient errors (429, 500, 503) are retried within them
+GOOGLE_STT_TIMEOUT = float(os.getenv("GOOGLE_STT_TIMEOUT", "10"))
+GOOGLE_TTS_TIMEOUT = float(os.getenv("GOOGLE_TTS_TIMEOUT", "8"))
+
+# Primary calls that lost the race keep running here instead of blocking the turn (until their
+# deadline). The fallback has its own workers, so stuck primaries can never hold it up.
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="engine")
+_fallback_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="engine-fallback")
+
+
+# Function for the timeout= and retry= options of a Google API call with the given deadline
+def call_options(deadline):
+    from google.api_core.retry import Retry
+    return {"timeout": deadline, "retry": Retry(initial=0.25, maximum=2.0, timeout=deadline)}
+
+
+class GoogleSTT:
+    name = "google"
+
+    def recognize(self, pcm):
+        from voicebot import cloud_speech_to_text
+        return cloud_speech_to_text(pcm, **call_options(GOOGLE_STT_TIMEOUT))
+
+
+class GoogleTTS:
+    name = "google"
+
+    def synthesize(self, text):
+        from voicebot import cloud_synthesize
+        return cloud_synthesize(text, **call_options(GOOGLE_TTS_TIMEOUT))
+
+
+class VoskSTT:
+    """Offline recognition with Vosk; needs an Indonesian model unpacked at VOSK_MODEL_PATH."""
+
+    name = "local"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        import vosk
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.model = vosk.Model(model_path)
+
+    def recognize(self, pcm):
+        recognizer = self._vosk.KaldiRecognizer(self.model, 16000)
+        recognizer.AcceptWaveform(bytes(pcm))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+class Pyttsx3TTS:
+    """Offline synthesis with pyttsx3 (espeak on Linux); returns WAV bytes."""
+
+    name = "local"
+
+    def __init__(self, voice=LOCAL_TTS_VOICE):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self._lock = threading.Lock()  # the driver handles one utterance at a time
+        for candidate in self.engine.getProperty("voices"):
+            names = [candidate.id, candidate.name or ""] + [str(lang) for lang in candidate.languages or []]
+            if any(voice in name.lower() for name in names):
+                self.engine.setProperty("voice", candidate.id)
+                break
+
+    def synthesize(self, text):
+        import tempfile
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            path = tmp.name
+        try:
+            with self._lock:
+                self.engine.save_to_file(text, path)
+                self.engine.runAndWait()
+            with open(path, "rb") as f:
+                audio = f.read()
+        finally:
+            os.remove(path)
+        # Some drivers write headerless PCM; always hand back a proper WAV container
+        if audio[:4] != b"RIFF":
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(22050)
+                wf.writeframes(audio)
+            audio = buffer.getvalue()
+        return audio
+
+
+class HedgedEngine:
+    """Runs the primary engine and, past `budget` seconds or on failure, the fallback as well.
+
+    The first answer that arrives without an error wins; the loser is left to finish in the
+    background. Only if both fail is the primary's error raised.
+    """
+
+    def __init__(self, primary, fallback, budget, kind):
+        self.primary = primary
+        self.fallback = fallback
+        self.budget = budget
+        self.kind = kind
+        self.name = f"hedged({primary.name}, {fallback.name})"
+
+    def _call(self, method, arg):
+        primary = _pool.submit(getattr(self.primary, method), arg)
+        done, _ = wait([primary], timeout=self.budget)
+        if done and primary.exception() is None:
+            metrics.inc("hedge", kind=self.kind, winner=self.primary.name)
+            return primary.result()
+
+        metrics.inc("hedge_backup", kind=self.kind, reason="error" if done else "budget")
+        pending = {primary, _fallback_pool.submit(getattr(self.fallback, method), arg)}
+        names = {id(primary): self.primary.name}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    metrics.inc("hedge", kind=self.kind, winner=names.get(id(future), self.fallback.name))
+                    return future.result()
+        raise primary.exception()
+
+    def recognize(self, pcm):
+        return self._call("recognize", pcm)
+
+    def synthesize(self, text):
+        return self._call("synthesize", text)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _cached(key, factory):
+    with _engines_lock:
+        if key not in _engines:
+            try:
+                _engines[key] = factory()
+            except Exception as e:  # optional dependency or model missing
+                print(f"Local {key} engine unavailable: {e}")
+                _engines[key] = None
+        return _engines[key]
+
+
+# Function for the local engines (None when not installed)
+def get_local_stt():
+    return _cached("stt", VoskSTT)
+
+
+def get_local_tts():
+    return _cached("tts", Pyttsx3TTS)
+
+
+def _select(choice, cloud, local, budget, kind):
+    if choice == "local" and local is not None:
+        return local
+    if choice == "hedged" and local is not None:
+        return HedgedEngine(cloud, local, budget, kind)
+    return cloud
+
+
+# Function for the speech-to-text engine chosen by STT_ENGINE
+def get_stt_engine():
+    local = get_local_stt() if STT_ENGINE in ("local", "hedged") else None
+    return _select(STT_ENGINE, GoogleSTT(), local, STT_HEDGE_BUDGET, "stt")
+
+
+# Function for the text-to-speech engine chosen by TTS_ENGINE
+def get_tts_engine():
+    local = get_local_tts() if TTS_ENGINE in ("local", "hedged") else None
+    return _select(TTS_ENGINE, GoogleTTS(), local, TTS_HEDGE_BUDGET, "tts")
@@ -0,0 +1,216 @@
+import json
+import time
+import wave
+import random
+import threading
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Local stand-ins for the cloud services, for running the voice pipeline offline.
+
+
+# Function for replaying a WAV file as raw PCM chunks, like microphone_chunks does
+def wav_chunks(path, chunk=1024, realtime=False):
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        while True:
+            data = wf.readframes(chunk)
+            if not data:
+                break
+            yield data
+            if realtime:
+                time.sleep(chunk / rate)
+
+
+def _streaming_response(transcript, is_final, stability=0.0):
+    alternative = SimpleNamespace(transcript=transcript, confidence=0.9 if is_final else 0.0)
+    result = SimpleNamespace(alternatives=[alternative], is_final=is_final, stability=stability)
+    return SimpleNamespace(results=[result])
+
+
+# Sleeps like a slow API call; past the call's timeout it gives up the way the Google clients do
+def _wait(latency, timeout=None):
+    if timeout is not None and latency > timeout:
+        from google.api_core.exceptions import DeadlineExceeded
+        time.sleep(timeout)
+        raise DeadlineExceeded(f"Deadline of {timeout}s exceeded")
+    time.sleep(max(0.0, latency))
+
+
+class FakeSpeechClient:
+    """Replays a fixed transcript for whatever audio is streamed or uploaded.
+
+    Interim results reveal the transcript word by word while audio arrives, and the final
+    result is emitted once the request iterator is exhausted (or after final_after_chunks).
+    For `recognize`, `transcript` may also be a function of the uploaded audio (decoded to PCM), and it takes
+    `latency` plus `per_audio_second` for every second of 16 kHz PCM, with optional jitter.
+    """
+
+    def __init__(self, transcript, chunks_per_word=4, final_after_chunks=None, latency=0.0,
+                 per_audio_second=0.0, jitter=0.0, seed=0):
+        self.transcript = transcript
+        self.chunks_per_word = chunks_per_word
+        self.final_after_chunks = final_after_chunks
+        self.latency = latency
+        self.per_audio_second = per_audio_second
+        self.jitter = jitter
+        self.chunks_received = 0
+        self._random = random.Random(seed)
+
+    def recognize(self, config=None, audio=None, timeout=None, retry=None):
+        from audio_io import decode_audio
+
+        content = getattr(audio, "content", b"") or b""
+        # Uploads may be FLAC or Opus (audio_io.STT_CODEC): timing and transcripts go by the PCM
+        encoding = getattr(getattr(config, "encoding", None), "name", "LINEAR16")
+        pcm = decode_audio(content, encoding) if content else b""
+        latency = self.latency + self.per_audio_second * len(pcm) / 32000
+        _wait(latency * (1 + self._random.uniform(-self.jitter, self.jitter)), timeout)
+        transcript = self.transcript(pcm) if callable(self.transcript) else self.transcript
+        if not transcript:
+            return SimpleNamespace(results=[])
+        return _streaming_response(transcript, True)
+
+    def streaming_recognize(self, config=None, requests=()):
+        words = self.transcript.split()
+        self.chunks_received = 0
+        for _ in requests:
+            self.chunks_received += 1
+            if self.final_after_chunks and self.chunks_received >= self.final_after_chunks:
+                break
+            shown = self.chunks_received // self.chunks_per_word
+            if self.chunks_received % self.chunks_per_word == 0 and shown <= len(words):
+                yield _streaming_response(" ".join(words[:shown]), False, stability=0.5)
+        time.sleep(self.latency)
+        if self.transcript:
+            yield _streaming_response(self.transcript, True)
+
+
+class FakeLLM:
+    """Gemini stand-in: first-token latency, then words at a fixed rate (plus optional jitter)."""
+
+    def __init__(self, reply, first_token_latency=0.5, tokens_per_second=30.0, jitter=0.0, seed=0):
+        self.reply = reply
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    def _sleep(self, seconds):
+        time.sleep(max(0.0, seconds + self._random.uniform(-self.jitter, self.jitter) * seconds))
+
+    def _chunks(self):
+        self._sleep(self.first_token_latency)
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                self._sleep(1 / self.tokens_per_second)
+            yield SimpleNamespace(text=word + (" " if i < len(words) - 1 else ""))
+
+    def generate_content(self, contents, stream=False):
+        if stream:
+            return self._chunks()
+        text = "".join(chunk.text for chunk in self._chunks())
+        return SimpleNamespace(text=text)
+
+
+class FakeTTS:
+    """Text-to-Speech stand-in whose latency grows with the text length."""
+
+    def __init__(self, base_latency=0.15, per_char=0.002, jitter=0.0, seed=0):
+        self.base_latency = base_latency
+        self.per_char = per_char
+        self.jitter = jitter
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def synthesize(self, text):
+        with self._lock:
+            self.calls += 1
+            noise = self._random.uniform(-self.jitter, self.jitter)
+        latency = (self.base_latency + self.per_char * len(text)) * (1 + noise)
+        time.sleep(max(0.0, latency))
+        return f"<audio:{text}>".encode("utf-8")
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, timeout=None, retry=None):
+        if timeout is not None and self.base_latency + self.per_char * len(input.text) > timeout:
+            _wait(float("inf"), timeout)
+        return SimpleNamespace(audio_content=self.synthesize(input.text))
+
+
+class _TwilioHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        fake = self.server.fake
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        fields = {name: values[0] for name, values in form.items()}
+        to = fields.get("To", "")
+        status, payload = fake.respond(to, fields)
+        self._reply(status, payload)
+
+
+class FakeTwilioServer:
+    """Local HTTP server speaking just enough of the Twilio Messages API.
+
+    Point a Twilio client at `url` (sos.TWILIO_BASE_URL). Numbers in `fail_first` answer
+    503 for that many attempts before succeeding; numbers in `reject` always answer 400.
+    Every accepted message is recorded in `messages`.
+    """
+
+    def __init__(self, latency=0.0, fail_first=None, reject=()):
+        self.latency = latency
+        self.fail_first = dict(fail_first or {})
+        self.reject = set(reject)
+        self.messages = []
+        self.attempts = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _TwilioHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        self._thread = None
+
+    def respond(self, to, fields):
+        number = to.replace("whatsapp:", "")
+        time.sleep(self.latency)
+        with self._lock:
+            self.attempts[number] = self.attempts.get(number, 0) + 1
+            if number in self.reject:
+                return 400, {"code": 21211, "message": f"Invalid 'To' Phone Number: {number}", "status": 400}
+            if self.attempts[number] <= self.fail_first.get(number, 0):
+                return 503, {"code": 20503, "message": "Service unavailable", "status": 503}
+            sid = f"SM{len(self.messages) + 1:032x}"
+            self.messages.append(dict(fields, sid=sid))
+        return 201, {"sid": sid, "status": "queued", "to": to, "from": fields.get("From")}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-twilio", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
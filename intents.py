@@ -0,0 +1,94 @@
+import os
+import re
+import json
+
+# Intent table: names, responses, priorities and synonyms (override with INTENTS_PATH)
+INTENTS_PATH = os.getenv("INTENTS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intents.json"))
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_REPEATED = re.compile(r"(.)\1+")
+# Common Indonesian clitics/particles: "capeknya", "bosanlah", "obatku", "sepikah"
+_SUFFIXES = ("nya", "lah", "kah", "pun", "ku", "mu")
+_AFFIXED_ENDINGS = _SUFFIXES + ("an",)
+
+
+# Function for normalizing one word: repeated letters collapse ("halooo" -> "halo")
+def normalize_token(token):
+    return _REPEATED.sub(r"\1", token)
+
+
+# Function for turning free text into normalized tokens
+def tokenize(text):
+    return [normalize_token(t) for t in _NON_WORD.split(text.lower()) if t]
+
+
+# Function for stripping one clitic suffix, keeping at least a three-letter stem
+def strip_suffix(token):
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+# Function for the other stems of a normalized word once the ke- prefix and the -an suffix are
+# dropped too: "kecapekan" -> "capek", "kehujanan" -> "hujan", "kesepianya" -> "kesepian", "sepi"
+def affix_stems(token):
+    if not (token.startswith("ke") or token.endswith(_AFFIXED_ENDINGS)):
+        return ()  # most words: nothing to strip
+    stems = {strip_suffix(token)}
+    # Collapsed repeats join a stem to its suffix: "kesepiannya" is tokenized as "kesepianya"
+    stems.update([token[:1 - len(s)] for s in _SUFFIXES if token.endswith(s) and len(token) - len(s) >= 2])
+    stems.update([stem[:-2] for stem in stems if stem.endswith("an") and len(stem) >= 5])
+    stems.update([stem[2:] for stem in stems if stem.startswith("ke") and len(stem) >= 5])
+    stems.discard(token)
+    return stems
+
+
+class IntentMatcher:
+    """Matches text against every synonym at once via a phrase table of normalized token n-grams.
+
+    Matching costs O(tokens x longest synonym) dictionary lookups, independent of how many
+    intents or synonyms the table holds.
+    """
+
+    def __init__(self, intents):
+        self.intents = list(intents)
+        self._phrases = {}  # tuple of tokens -> (rank, intent)
+        self._max_len = 1
+        for order, intent in enumerate(self.intents):
+            # Higher priority wins; ties go to the intent listed first in the file
+            rank = (-intent.get("priority", 0), order)
+            for synonym in [intent["name"]] + intent.get("synonyms", []):
+                phrase = tuple(tokenize(synonym))
+                if not phrase:
+                    continue
+                current = self._phrases.get(phrase)
+                if current is None or rank < current[0]:
+                    self._phrases[phrase] = (rank, intent)
+                self._max_len = max(self._max_len, len(phrase))
+
+    @classmethod
+    def from_file(cls, path=INTENTS_PATH):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["intents"])
+
+    # Returns the best matching intent dict, or None
+    def match(self, text):
+        tokens = tokenize(text)
+        stems = [strip_suffix(t) for t in tokens]
+        best = None
+        for i in range(len(tokens)):
+            for length in range(1, min(self._max_len, len(tokens) - i) + 1):
+                for words in (tokens, stems):
+                    found = self._phrases.get(tuple(words[i:i + length]))
+                    if found is not None and (best is None or found[0] < best[0]):
+                        best = found
+            # Affixed forms ("kecapekan") match single-word synonyms through their stems
+            for stem in affix_stems(tokens[i]):
+                found = self._phrases.get((stem,))
+                if found is not None and (best is None or found[0] < best[0]):
+                    best = found
+        return best[1] if best else None
+
+    def responses(self):
+        return {intent["name"]: intent["response"] for intent in self.intents}
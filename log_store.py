@@ -0,0 +1,117 @@
+import io
+import os
+import csv
+import sqlite3
+import datetime
+import threading
+import streamlit as st
+
+# Durable, append-only reminder log. Entries are never updated or deleted, so the newest row ID
+# of a user doubles as the version of their log: the Excel export is rebuilt only when it changes.
+LOG_DB = os.getenv("REMINDER_LOG_DB", "reminder_log.sqlite")
+PAGE_SIZE = 50
+COLUMNS = ["Pesan Pengingat", "Status", "Waktu"]
+
+
+class LogStore:
+    def __init__(self, path=LOG_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS log_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                message TEXT NOT NULL,
+                status TEXT NOT NULL,
+                logged_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS log_entries_user ON log_entries (user_id, id)")
+        self._conn.commit()
+
+    def append(self, user_id, message, status, logged_at=None):
+        logged_at = logged_at or datetime.datetime.now()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO log_entries (user_id, message, status, logged_at) VALUES (?, ?, ?, ?)",
+                (user_id, message, status, logged_at.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    # Function for the log version of a user (0 when empty); changes on every append
+    def version(self, user_id):
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(id) FROM log_entries WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] or 0
+
+    def count(self, user_id):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM log_entries WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    # Function for one page of entries, newest first (page numbers start at 1)
+    def page(self, user_id, page=1, page_size=PAGE_SIZE):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT message, status, logged_at FROM log_entries WHERE user_id = ? "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                (user_id, page_size, (page - 1) * page_size),
+            ).fetchall()
+
+    # Function for all entries in order, fetched in batches (keyset pagination, constant memory)
+    def iter_rows(self, user_id, batch_size=1000):
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, message, status, logged_at FROM log_entries WHERE user_id = ? AND id > ? "
+                    "ORDER BY id LIMIT ?",
+                    (user_id, last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[1:]
+            last_id = rows[-1][0]
+
+    # Function for a streaming CSV export, one text chunk per batch of rows
+    def csv_chunks(self, user_id, batch_size=1000):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        for i, row in enumerate(self.iter_rows(user_id, batch_size), start=1):
+            writer.writerow(row)
+            if i % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+
+# Function for the process-wide log store
+@st.cache_resource(show_spinner=False)
+def get_log_store():
+    return LogStore()
+
+
+# Function for the Excel export; cached per (user, version), so reruns don't re-serialize the log
+@st.cache_data(max_entries=16, show_spinner=False)
+def xlsx_export(user_id, version):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Log Pengingat")
+    sheet.append(COLUMNS)
+    for row in get_log_store().iter_rows(user_id):
+        sheet.append(list(row))
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+# Function for the CSV export as UTF-8 chunks, read from the store batch by batch (never cached whole)
+def csv_export(user_id, batch_size=1000):
+    for chunk in get_log_store().csv_chunks(user_id, batch_size):
+        yield chunk.encode("utf-8")
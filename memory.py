@@ -0,0 +1,98 @@
+import os
+import threading
+from collections import deque
+import streamlit as st
+
+# Limits for the per-session conversation memory (override with environment variables)
+MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "20"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "120"))
+
+
+# Function for a cheap token estimate (Gemini averages roughly 4 characters per token)
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """Bounded conversation history for one session.
+
+    Recent turns live in a deque; turns that fall off the end are folded into a short summary,
+    either by the given summarizer (summary, evicted_line) -> summary or by keeping the newest
+    user lines that fit SUMMARY_TOKEN_BUDGET.
+    """
+
+    def __init__(self, max_turns=MAX_TURNS, token_budget=CONTEXT_TOKEN_BUDGET,
+                 summary_budget=SUMMARY_TOKEN_BUDGET, summarizer=None, user_id=None):
+        self.user_id = user_id  # whose conversation this is; scopes the shared answer cache
+        self.turns = deque(maxlen=max_turns)
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+        self.summary = ""
+        self._summary_lines = deque()
+        self._lock = threading.Lock()
+
+    def add(self, speaker, text):
+        line = f"{speaker}: {text}"
+        with self._lock:
+            if len(self.turns) == self.turns.maxlen:
+                self._fold(self.turns[0])
+            self.turns.append(line)
+
+    def _fold(self, line):
+        if self.summarizer is not None:
+            self.summary = self.summarizer(self.summary, line)
+            return
+        if not line.startswith("User:"):
+            return  # what the user said matters more than our own replies
+        self._summary_lines.append(line[len("User: "):])
+        while self._summary_lines and estimate_tokens("; ".join(self._summary_lines)) > self.summary_budget:
+            self._summary_lines.popleft()
+        self.summary = "; ".join(self._summary_lines)
+
+    # Function for the last n turns as plain lines
+    def recent(self, n):
+        with self._lock:
+            return list(self.turns)[-n:] if n else []
+
+    # Function for the prompt context: newest turns first until the token budget is spent
+    def context(self, token_budget=None):
+        budget = self.token_budget if token_budget is None else token_budget
+        with self._lock:
+            selected = []
+            used = 0
+            for line in reversed(self.turns):
+                cost = estimate_tokens(line)
+                if selected and used + cost > budget:
+                    break
+                selected.append(line)
+                used += cost
+            selected.reverse()
+
+            if self.summary:
+                summary_line = f"(Sebelumnya pengguna membahas: {self.summary})"
+                if used + estimate_tokens(summary_line) <= budget:
+                    selected.insert(0, summary_line)
+        return "\n".join(selected)
+
+    def clear(self):
+        with self._lock:
+            self.turns.clear()
+            self._summary_lines.clear()
+            self.summary = ""
+
+
+# Used when there is no Streamlit session, e.g. scripts and benchmarks
+_local_memory = ConversationMemory()
+
+
+# Function for the conversation memory of the current Streamlit session
+def get_session_memory():
+    try:
+        if "conversation_memory" not in st.session_state:
+            from scheduler_service import current_user_id
+            st.session_state.conversation_memory = ConversationMemory(user_id=current_user_id())
+        return st.session_state.conversation_memory
+    except Exception:
+        return _local_memory
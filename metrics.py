@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Process-wide timing spans and counters. Spans land in fixed-bucket histograms (exported in the
+# Prometheus text format) and in a short window of recent samples for the in-app latency panel.
+# Set METRICS_FILE to also append every span as a JSON line, and METRICS_PORT to serve /metrics.
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+PREFIX = "vocacare"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SAMPLES = 512
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+
+class Metrics:
+    def __init__(self, path=METRICS_FILE):
+        self.path = path
+        self._histograms = {}  # (name, label key) -> Histogram
+        self._counters = {}    # (name, label key) -> value
+        self._lock = threading.Lock()
+        self._file = None
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+            if self.path:
+                self._write({"ts": time.time(), "span": name, "seconds": round(seconds, 6), **labels})
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # Function for timing a block: `with metrics.span("tts", source="api"): ...`
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def _write(self, record):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps(record) + "\n")
+
+    # Function for all metrics in the Prometheus text exposition format
+    def prometheus_text(self):
+        lines, typed = [], set()
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            for (name, key), histogram in histograms:
+                metric = f"{PREFIX}_{name}_seconds"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+            for (name, key), value in counters:
+                metric = f"{PREFIX}_{name}_total"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{_format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    # Function for the latency panel: one row per span with count and recent p50/p95 in ms
+    def summary(self):
+        rows = []
+        with self._lock:
+            for (name, key), histogram in sorted(self._histograms.items()):
+                recent = sorted(histogram.recent)
+                if not recent:
+                    continue
+                rows.append({
+                    "span": name + _format_labels(key),
+                    "count": histogram.count,
+                    "p50 ms": round(recent[len(recent) // 2] * 1000, 1),
+                    "p95 ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 1),
+                })
+        return rows
+
+    def counters(self):
+        with self._lock:
+            return {name + _format_labels(key): value for (name, key), value in sorted(self._counters.items())}
+
+
+# Process-wide metrics, shared by every session and background thread
+metrics = Metrics()
+span = metrics.span
+observe = metrics.observe
+inc = metrics.inc
+
+_server = None
+_server_lock = threading.Lock()
+
+
+# Function for serving GET /metrics on METRICS_PORT (once per process; no-op when unset)
+def serve(port=METRICS_PORT):
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+            class Handler(BaseHTTPRequestHandler):
+                def log_message(self, format, *args):
+                    pass
+
+                def do_GET(self):
+                    body = metrics.prometheus_text().encode("utf-8")
+                    self.send_response(200 if self.path.startswith("/metrics") else 404)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            _server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
@@ -0,0 +1,217 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+import metrics
+
+# Durable outbox for WhatsApp notifications. The UI only inserts a row; a single background
+# worker sends due messages in batches under a global rate limit and retries transient failures.
+# Saves with the same coalesce key within the window collapse into one message (latest wins).
+OUTBOX_DB = os.getenv("OUTBOX_DB", "outbox.sqlite")
+FROM_NUMBER = os.getenv("TWILIO_WHATSAPP_FROM", "whatsapp:+14155238886")
+COALESCE_SECONDS = float(os.getenv("OUTBOX_COALESCE_SECONDS", "30"))
+RATE_PER_SECOND = float(os.getenv("OUTBOX_RATE_PER_SECOND", "1"))  # Twilio's default per-sender limit
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "2"))
+BATCH_SIZE = 20
+
+
+class RateLimiter:
+    """Token bucket: `rate` sends per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            time.sleep((1 - self.tokens) / self.rate)
+
+
+# Function for sending one WhatsApp message through Twilio; returns the message SID
+def twilio_sender(base_url=None):
+    from clients import make_twilio_client
+    client = make_twilio_client(pool_size=1, base_url=base_url or os.getenv("TWILIO_BASE_URL"))
+
+    def send(to_number, body):
+        return client.messages.create(from_=FROM_NUMBER, body=body, to=f"whatsapp:{to_number}").sid
+    return send
+
+
+class Outbox:
+    """SQLite-backed message queue with one sending thread.
+
+    Rows move pending -> sending -> sent, or back to pending with a later due time after a
+    transient failure, or to failed once MAX_ATTEMPTS is used up or the error is permanent.
+    """
+
+    def __init__(self, path=OUTBOX_DB, sender=None, rate=RATE_PER_SECOND, coalesce_seconds=COALESCE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, backoff=BACKOFF_SECONDS):
+        self.path = path
+        self.sender = sender
+        self.limiter = RateLimiter(rate)
+        self.coalesce_seconds = coalesce_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                to_number TEXT NOT NULL,
+                body TEXT NOT NULL,
+                coalesce_key TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                due_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                sid TEXT,
+                error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, due_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_coalesce ON outbox (coalesce_key, status)")
+        # Rows claimed by a worker that died mid-send go out again (at-least-once delivery)
+        self._conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+        self._conn.commit()
+
+    # Function for queueing a message; returns its row ID. A pending message to the same number
+    # with the same coalesce key gets the new body instead, keeping its original due time.
+    def enqueue(self, user_id, to_number, body, coalesce_key=None):
+        now = time.time()
+        with self._lock:
+            row = None
+            if coalesce_key:
+                row = self._conn.execute(
+                    "SELECT id FROM outbox WHERE coalesce_key = ? AND to_number = ? AND status = 'pending' AND attempts = 0",
+                    (coalesce_key, to_number),
+                ).fetchone()
+            if row:
+                message_id = row[0]
+                self._conn.execute("UPDATE outbox SET body = ? WHERE id = ?", (body, message_id))
+            else:
+                due_at = now + (self.coalesce_seconds if coalesce_key else 0)
+                message_id = self._conn.execute(
+                    "INSERT INTO outbox (user_id, to_number, body, coalesce_key, due_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, to_number, body, coalesce_key, due_at, now),
+                ).lastrowid
+            self._conn.commit()
+        self._wake.set()
+        return message_id
+
+    # Function for the state of one message: dict with status, attempts, sid and error
+    def status(self, message_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, attempts, sid, error, due_at FROM outbox WHERE id = ?", (message_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("status", "attempts", "sid", "error", "due_at"), row))
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')").fetchone()[0]
+
+    # Function for claiming up to `limit` due messages in one transaction
+    def _claim(self, limit=BATCH_SIZE):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, to_number, body, attempts FROM outbox WHERE status = 'pending' AND due_at <= ? "
+                "ORDER BY due_at LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+            if rows:
+                self._conn.executemany("UPDATE outbox SET status = 'sending' WHERE id = ?", [(row[0],) for row in rows])
+                self._conn.commit()
+        return rows
+
+    def _next_due(self):
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(due_at) FROM outbox WHERE status = 'pending'").fetchone()
+        return row[0]
+
+    # Function for sending one claimed batch; results are written back in one transaction
+    def process_batch(self):
+        from clients import is_retryable
+
+        rows = self._claim()
+        updates = []
+        for message_id, to_number, body, attempts in rows:
+            attempts += 1
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                sid = self.sender(to_number, body)
+                updates.append(("sent", attempts, sid, None, time.time(), message_id))
+                metrics.inc("outbox_messages", status="sent")
+            except Exception as e:
+                metrics.inc("outbox_messages", status="error")
+                if attempts < self.max_attempts and is_retryable(e):
+                    delay = self.backoff * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+                    updates.append(("pending", attempts, None, str(e), time.time() + delay, message_id))
+                else:
+                    updates.append(("failed", attempts, None, str(e), time.time(), message_id))
+            finally:
+                metrics.observe("twilio_send", time.perf_counter() - start, channel="checklist")
+        if updates:
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, attempts = ?, sid = ?, error = ?, due_at = ? WHERE id = ?", updates
+                )
+                self._conn.commit()
+        return len(rows)
+
+    def _run(self):
+        if self.sender is None:
+            self.sender = twilio_sender()  # built here so the first enqueue never waits on the Twilio import
+        while not self._stopped.is_set():
+            try:
+                if self.process_batch():
+                    continue
+            except Exception as e:
+                print(f"Outbox worker error: {e}")
+            next_due = self._next_due()
+            timeout = 60 if next_due is None else min(60, max(0.0, next_due - time.time()))
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+# Function for the process-wide outbox, with its worker running
+def get_outbox():
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox().start()
+        return _outbox
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import threading
+
+# Location of the pre-rendered phrase bundle (override with PHRASE_BUNDLE_PATH)
+BUNDLE_PATH = os.getenv("PHRASE_BUNDLE_PATH", "phrases.bundle")
+
+# File layout: MAGIC | index length (uint64, little endian) | JSON index | audio blobs
+# The index maps a tts_cache.speech_key to [offset, length] relative to the start of the blobs.
+MAGIC = b"VCPHRASE1\n"
+_HEADER = struct.Struct("<Q")
+
+
+class PhraseBundle:
+    """Read-only, memory-mapped collection of pre-synthesized phrases."""
+
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a phrase bundle")
+        start = len(MAGIC)
+        (index_length,) = _HEADER.unpack_from(self._mmap, start)
+        start += _HEADER.size
+        self._index = json.loads(self._mmap[start:start + index_length].decode("utf-8"))
+        self._data_start = start + index_length
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    # Returns a zero-copy view into the mapped file, or None if the phrase isn't bundled
+    def get(self, key):
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        start = self._data_start + offset
+        return memoryview(self._mmap)[start:start + length]
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+# Function for writing a bundle from (key, audio bytes) pairs
+def write_bundle(path, phrases):
+    index = {}
+    blobs = []
+    offset = 0
+    for key, audio in phrases:
+        if key in index:
+            continue
+        index[key] = [offset, len(audio)]
+        blobs.append(audio)
+        offset += len(audio)
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(MAGIC)
+        out.write(_HEADER.pack(len(index_bytes)))
+        out.write(index_bytes)
+        for audio in blobs:
+            out.write(audio)
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+_bundle = None
+_bundle_loaded = False
+_bundle_lock = threading.Lock()
+
+
+# Function for the process-wide bundle (None when it hasn't been built yet)
+def get_bundle():
+    global _bundle, _bundle_loaded
+    with _bundle_lock:
+        if not _bundle_loaded:
+            _bundle_loaded = True
+            if os.path.exists(BUNDLE_PATH):
+                try:
+                    _bundle = PhraseBundle(BUNDLE_PATH)
+                except (OSError, ValueError) as e:
+                    print(f"Phrase bundle not loaded: {e}")
+        return _bundle
+
+
+# Function for looking up pre-rendered audio by speech key
+def lookup(key):
+    bundle = get_bundle()
+    if bundle is None:
+        return None
+    return bundle.get(key)
+
+
+# Function for synthesizing every fixed phrase once and writing the bundle
+def build(path=BUNDLE_PATH):
+    from google.cloud import texttospeech
+    from tts_cache import speech_key
+    import voicebot
+
+    texts = list(voicebot.predefined_responses.values())
+    texts += list(voicebot.daily_reminders.values())
+    texts.append(voicebot.hourly_reminder)
+
+    voice = voicebot.voice_params()
+    audio_config = voicebot.audio_params()
+    phrases = []
+    for text in dict.fromkeys(texts):
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        response = voicebot.get_tts_client().synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
+        phrases.append((speech_key(synthesis_input, voice, audio_config), response.audio_content))
+
+    count = write_bundle(path, phrases)
+    print(f"Wrote {count} phrases to {path}")
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python phrase_bundle.py build [output_path]")
+        sys.exit(1)
+    build(sys.argv[2] if len(sys.argv) > 2 else BUNDLE_PATH)
@@ -0,0 +1,164 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+import datetime
+import metrics
+
+# Reminder playback off the scheduler threads. A scheduler job only pushes the reminder onto
+# this queue; one audio thread synthesizes and plays them, so reminders never talk over each
+# other and a long clip doesn't hold up other jobs. Reminders arriving within COALESCE_SECONDS
+# of each other are spoken as one utterance, most important first (medication before hydration).
+COALESCE_SECONDS = float(os.getenv("REMINDER_COALESCE_SECONDS", "1.0"))
+MEDICATION_WORDS = ("obat", "vitamin", "insulin")
+HYDRATION_WORDS = ("minum air", "terhidrasi")
+
+
+# Function for a reminder's priority from its text (higher is spoken first)
+def reminder_priority(message):
+    text = message.lower()
+    if any(word in text for word in MEDICATION_WORDS):
+        return 10
+    if any(word in text for word in HYDRATION_WORDS):
+        return 0
+    return 5
+
+
+class QueuedReminder:
+    def __init__(self, message, user_id, priority, due, seq):
+        self.message = message
+        self.user_id = user_id
+        self.priority = priority
+        self.due = due  # when the reminder was scheduled to sound (naive local time)
+        self.seq = seq
+        self.enqueued = time.perf_counter()
+
+    def __lt__(self, other):
+        # Timestamps, so naive and timezone-aware due times can share the queue
+        return (-self.priority, self.due.timestamp(), self.seq) < (-other.priority, other.due.timestamp(), other.seq)
+
+
+class ReminderPlayer:
+    """Priority queue of reminders with a single playback thread.
+
+    synthesize(text) -> audio bytes and play(audio) default to the reminder voice and the
+    server speakers; log(message, user_id) records each reminder once it has been played.
+    """
+
+    def __init__(self, synthesize=None, play=None, log=None, coalesce_seconds=COALESCE_SECONDS):
+        self.synthesize = synthesize
+        self.play = play
+        self.log = log
+        self.coalesce_seconds = coalesce_seconds
+        self.played = 0
+        self.utterances = 0
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    # Function for queueing a reminder; only a heap push, so it is safe on a scheduler thread
+    def enqueue(self, message, user_id=None, due=None, priority=None):
+        priority = reminder_priority(message) if priority is None else priority
+        item = QueuedReminder(message, user_id, priority, due or datetime.datetime.now(), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._heap, item)
+            self._cond.notify()
+        metrics.inc("reminder_queued")
+        return item
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def start(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="reminder-audio", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # Function for the next group of reminders: waits for one, then gathers those that arrive
+    # within the coalescing window, in priority order without repeated messages
+    def _take_group(self):
+        with self._cond:
+            while not self._heap and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return []
+            deadline = time.monotonic() + self.coalesce_seconds
+            remaining = self.coalesce_seconds
+            while remaining > 0 and not self._stopping:
+                self._cond.wait(remaining)
+                remaining = deadline - time.monotonic()
+            group = [heapq.heappop(self._heap) for _ in range(len(self._heap))]
+        seen, unique = set(), []
+        for item in group:
+            if (item.user_id, item.message) not in seen:
+                seen.add((item.user_id, item.message))
+                unique.append(item)
+        return unique
+
+    def _defaults(self):
+        import reminder
+        self.synthesize = self.synthesize or reminder.reminder_audio
+        self.play = self.play or reminder.play_bytes
+        self.log = self.log or (lambda message, user_id: reminder.log_reminder(message, status="Diputar", user_id=user_id))
+
+    def _run(self):
+        self._defaults()
+        while True:
+            group = self._take_group()
+            if not group:
+                return
+            try:
+                self.play_group(group)
+            except Exception as e:  # keep the audio thread alive for the next reminders
+                metrics.inc("reminder_playback_errors")
+                print(f"Reminder playback failed: {e}")
+
+    # Function for speaking a group of reminders as one utterance and logging each of them
+    def play_group(self, group):
+        from audio_io import join_clips
+
+        # One clip per message, so each reminder text stays a separate TTS cache entry
+        clips = [self.synthesize(item.message) for item in group]
+        audio = join_clips(clips)
+
+        started = time.perf_counter()
+        for item in group:
+            metrics.observe("reminder_queue_wait", started - item.enqueued)
+            # Fire lag end to end: scheduled time until the reminder starts to sound
+            lag = datetime.datetime.now(item.due.tzinfo) - item.due
+            metrics.observe("reminder_fire_lag", max(0.0, lag.total_seconds()))
+        with metrics.span("playback", source="reminder"):
+            for clip in ([audio] if audio else clips):  # mixed voices can't be joined: play in turn
+                self.play(clip)
+
+        self.utterances += 1
+        self.played += len(group)
+        for item in group:
+            self.log(item.message, item.user_id)
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+# Function for the process-wide reminder player, started on first use
+def get_player():
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = ReminderPlayer().start()
+        return _player
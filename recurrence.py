@@ -0,0 +1,190 @@
+import os
+import heapq
+import itertools
+import threading
+import datetime
+from collections import defaultdict
+from zoneinfo import ZoneInfo
+
+# Recurring reminders (daily, weekly, every N hours) kept in a min-heap of next fire times,
+# so checking what is due costs O(log n) per fired rule no matter how many rules exist.
+DEFAULT_TIMEZONE = os.getenv("VOCACARE_TIMEZONE", "Asia/Jakarta")
+CATCH_UP_WINDOW = datetime.timedelta(hours=float(os.getenv("REMINDER_CATCH_UP_HOURS", "3")))
+# Users without a turn for this long have their rules and undelivered reminders dropped
+INACTIVE_AFTER = datetime.timedelta(days=float(os.getenv("REMINDER_INACTIVE_DAYS", "7")))
+UTC = datetime.timezone.utc
+
+
+class Rule:
+    """One recurring reminder. Times are wall-clock times in the user's timezone.
+
+    kind is "daily" (hour, minute), "weekly" (hour, minute, weekdays with Monday=0) or
+    "every" (every_hours, counted from `anchor` local midnight by default).
+    """
+
+    def __init__(self, rule_id, user_id, message, kind, hour=0, minute=0, weekdays=(),
+                 every_hours=1, timezone=DEFAULT_TIMEZONE, anchor=None, priority=0):
+        if kind not in ("daily", "weekly", "every"):
+            raise ValueError(f"Unknown rule kind: {kind}")
+        self.rule_id = rule_id
+        self.user_id = user_id
+        self.message = message
+        self.kind = kind
+        self.hour = hour
+        self.minute = minute
+        self.weekdays = frozenset(weekdays)
+        self.every_hours = every_hours
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        self.anchor = anchor
+        self.priority = priority
+
+    # Function for the first occurrence strictly after `after` (aware datetime); returns UTC
+    def next_after(self, after):
+        local = after.astimezone(self.tz)
+        if self.kind == "every":
+            anchor = self.anchor or datetime.datetime(2000, 1, 1, self.hour, self.minute, tzinfo=self.tz)
+            step = datetime.timedelta(hours=self.every_hours)
+            # Count steps in absolute time so DST changes don't shift the cadence
+            elapsed = after.astimezone(UTC) - anchor.astimezone(UTC)
+            steps = elapsed // step + 1
+            return anchor.astimezone(UTC) + steps * step
+
+        candidate = local.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        for _ in range(8):
+            if candidate > local and (self.kind == "daily" or candidate.weekday() in self.weekdays):
+                return candidate.astimezone(UTC)
+            candidate = (candidate + datetime.timedelta(days=1)).replace(hour=self.hour, minute=self.minute)
+        raise ValueError(f"Rule {self.rule_id} has no weekdays to fire on")
+
+
+class RecurrenceEngine:
+    """Min-heap of (next fire time, rule). Removed/replaced rules are skipped lazily."""
+
+    def __init__(self, catch_up_window=CATCH_UP_WINDOW, inactive_after=INACTIVE_AFTER):
+        self.catch_up_window = catch_up_window
+        self.inactive_after = inactive_after
+        self._heap = []
+        self._rules = {}  # rule_id -> (rule, version)
+        self._versions = itertools.count()
+        self._lock = threading.Lock()
+        self.inbox = defaultdict(list)  # user_id -> [(fire time, rule)]
+        self._last_taken = {}  # user_id -> time of their last take()
+        self._last_sweep = None
+
+    def __len__(self):
+        return len(self._rules)
+
+    def __contains__(self, rule_id):
+        return rule_id in self._rules
+
+    # Function for adding (or replacing) a rule; it first fires after `now`
+    def add(self, rule, now=None):
+        now = now or datetime.datetime.now(UTC)
+        with self._lock:
+            version = next(self._versions)
+            self._rules[rule.rule_id] = (rule, version)
+            heapq.heappush(self._heap, (rule.next_after(now), version, rule.rule_id))
+
+    def get(self, rule_id):
+        entry = self._rules.get(rule_id)
+        return entry[0] if entry else None
+
+    def remove(self, rule_id):
+        with self._lock:
+            return self._rules.pop(rule_id, None) is not None
+
+    def next_fire_time(self):
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            _, version, rule_id = self._heap[0]
+            current = self._rules.get(rule_id)
+            if current is not None and current[1] == version:
+                return
+            heapq.heappop(self._heap)
+
+    # Function for every occurrence due at `now`, catching up on ones that passed in between.
+    # Occurrences older than the catch-up window are dropped; with latest_only, each rule
+    # reports only its most recent missed occurrence.
+    def due(self, now=None, latest_only=True):
+        now = now or datetime.datetime.now(UTC)
+        fired = []
+        with self._lock:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                when, version, rule_id = heapq.heappop(self._heap)
+                rule = self._rules[rule_id][0]
+
+                occurrences = []
+                if now - when > self.catch_up_window:
+                    # Skip straight to the window instead of walking a long backlog
+                    when = rule.next_after(now - self.catch_up_window - datetime.timedelta(microseconds=1))
+                while when <= now:
+                    if now - when <= self.catch_up_window:
+                        occurrences.append(when)
+                    when = rule.next_after(when)
+                if latest_only:
+                    occurrences = occurrences[-1:]
+                fired.extend((occurrence, rule) for occurrence in occurrences)
+                heapq.heappush(self._heap, (when, version, rule_id))
+        fired.sort(key=lambda item: (item[0], -item[1].priority))
+        return fired
+
+    # Function for moving due occurrences into the per-user inboxes. Inboxes only keep what is
+    # still inside the catch-up window, so users who don't come back can't grow them forever.
+    def collect(self, now=None):
+        now = now or datetime.datetime.now(UTC)
+        fired = self.due(now)
+        with self._lock:
+            for when, rule in fired:
+                self.inbox[rule.user_id].append((when, rule))
+            for user_id in {rule.user_id for _, rule in fired}:
+                self.inbox[user_id] = [(when, rule) for when, rule in self.inbox[user_id]
+                                       if now - when <= self.catch_up_window]
+        self.forget_inactive(now)
+
+    # Function for taking (and clearing) what is waiting for one user
+    def take(self, user_id, now=None):
+        now = now or datetime.datetime.now(UTC)
+        with self._lock:
+            self._last_taken[user_id] = now  # before collecting, so the sweep sees the user as active
+        self.collect(now)
+        with self._lock:
+            return self.inbox.pop(user_id, [])
+
+    # Function for putting taken occurrences back, e.g. when they could not be delivered
+    def restore(self, user_id, items):
+        with self._lock:
+            self.inbox[user_id][:0] = items
+
+    # Function for when a user last took their reminders (None if never)
+    def last_taken(self, user_id):
+        return self._last_taken.get(user_id)
+
+    # Function for dropping the rules and inboxes of users inactive for `inactive_after`
+    # (checked at most hourly; a returning user simply registers their rules again)
+    def forget_inactive(self, now=None):
+        now = now or datetime.datetime.now(UTC)
+        with self._lock:
+            if self._last_sweep is not None and now - self._last_sweep < datetime.timedelta(hours=1):
+                return 0
+            self._last_sweep = now
+            inactive = {user_id for user_id, taken in self._last_taken.items() if now - taken > self.inactive_after}
+            if not inactive:
+                return 0
+            for rule_id in [rule_id for rule_id, (rule, _) in self._rules.items() if rule.user_id in inactive]:
+                del self._rules[rule_id]  # its heap entry is skipped as stale
+            for user_id in inactive:
+                self.inbox.pop(user_id, None)
+                del self._last_taken[user_id]
+            return len(inactive)
+
+
+# Process-wide engine shared by every session
+reminder_engine = RecurrenceEngine()
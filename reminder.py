@@ -1,23 +1,17 @@
 import streamlit as st
-from google.cloud import texttospeech
-import os
 import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-import playsound
 import pandas as pd
-import io
+from tts_cache import synthesize_cached
+from audio_io import play_bytes
+from clients import get_tts_client
+import scheduler_service
+import metrics
+from log_store import get_log_store, xlsx_export, csv_export, PAGE_SIZE, COLUMNS
 
-# Setup scheduler
-scheduler = BackgroundScheduler()
+# Fungsi untuk suara pengingat (MP3 di memori, dari cache untuk pengingat yang berulang)
+def reminder_audio(message):
+    from google.cloud import texttospeech
 
-# Path to your Google Cloud credentials JSON file
-os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = 'new.json'
-
-# Google Cloud Text-to-Speech client
-client = texttospeech.TextToSpeechClient()
-
-# Fungsi untuk memainkan pengingat dengan suara
-def play_reminder(message):
     # Set up the synthesis input
     synthesis_input = texttospeech.SynthesisInput(text=message)
 
@@ -31,113 +25,83 @@ def play_reminder(message):
         audio_encoding=texttospeech.AudioEncoding.MP3
     )
 
-    # Perform the text-to-speech request
-    response = client.synthesize_speech(
-        input=synthesis_input, voice=voice, audio_config=audio_config
-    )
+    # Perform the text-to-speech request (served from the cache for repeated reminders)
+    with metrics.span("reminder_tts"):
+        return synthesize_cached(get_tts_client(), synthesis_input, voice, audio_config)
 
-    # Save the audio to a file
-    audio_path = "reminder.mp3"
-    with open(audio_path, "wb") as out:
-        out.write(response.audio_content)
+# Fungsi untuk memainkan pengingat dengan suara (blocks until played; scheduler jobs use the queue)
+def play_reminder(message, user_id=None):
+    audio_content = reminder_audio(message)
 
-    # Play the audio automatically
-    playsound.playsound(audio_path)
+    # Play the audio automatically (kept in memory, no shared reminder.mp3)
+    with metrics.span("playback", source="reminder"):
+        play_bytes(audio_content)
 
     # Log the reminder after completion
-    log_reminder(message)
-
-# Fungsi untuk menyimpan log pengingat
-def log_reminder(message):
-    log_entry = {
-        "Pesan Pengingat": message,
-        "Waktu": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-
-    if 'log_entries' not in st.session_state:
-        st.session_state.log_entries = []
-
-    st.session_state.log_entries.append(log_entry)
-
-# Fungsi untuk mengatur pengingat dan menjadwalkannya
-def set_reminder(reminder_time, message):
-    now = datetime.datetime.now()
-    time_to_wait = (reminder_time - now).total_seconds()
-    
-    # Add job to scheduler
-    scheduler.add_job(play_reminder, 'date', run_date=reminder_time, args=[message])
-    
-    return time_to_wait
-
-# Fungsi untuk mengunduh log sebagai file Excel (.xlsx)
-def download_log():
-    log_df = pd.DataFrame(st.session_state.log_entries)
-    if not log_df.empty:
-        # Convert to Excel and download
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            log_df.to_excel(writer, index=False, sheet_name="Log Pengingat")
-        output.seek(0)
-        return output
+    log_reminder(message, status="Diputar", user_id=user_id)
+
+# Fungsi untuk mengantrekan pengingat ke pemutar suara bersama; returns immediately
+def queue_reminder(message, user_id=None, due=None):
+    from playback_queue import get_player
+    return get_player().enqueue(message, user_id=user_id, due=due)
+
+# Fungsi untuk menyimpan log pengingat (append-only, tersimpan di disk)
+def log_reminder(message, status="Selesai", user_id=None, logged_at=None):
+    return get_log_store().append(user_id or scheduler_service.current_user_id(), message, status, logged_at)
+
+# Fungsi untuk mengatur pengingat dan menjadwalkannya (persisten, tanpa duplikat); returns the job ID
+def set_reminder(reminder_time, message, user_id=None):
+    start_scheduler()
+    return scheduler_service.schedule_reminder(reminder_time, message, user_id=user_id)
+
+# Fungsi untuk membatalkan pengingat yang belum berbunyi
+def cancel_reminder(job_id):
+    return scheduler_service.cancel_reminder(job_id)
+
+# Fungsi untuk mengunduh log sebagai file Excel (.xlsx); only rebuilt when the log has changed
+def download_log(user_id=None):
+    user_id = user_id or scheduler_service.current_user_id()
+    version = get_log_store().version(user_id)
+    if version:
+        return xlsx_export(user_id, version)
     return None
 
-# Streamlit UI
-st.title("Pengingat Kesehatan Lansia")
-
-# Teks penjelasan
-st.write("Ini adalah pengingat untuk membantu menjaga kesehatan Anda. Anda bisa mengatur waktu dan pesan pengingat untuk kegiatan Anda.")
-
-# Input waktu reminder dengan komponen waktu
-time_input = st.time_input("Pilih Waktu Pengingat", value=datetime.time(9, 0))  # default jam 9 pagi
-message = st.text_input("Pesan Pengingat (misal: Waktunya minum obat)")
+# Fungsi untuk menampilkan log pengingat per halaman, dengan unduhan .xlsx dan .csv
+def show_log(user_id=None):
+    user_id = user_id or scheduler_service.current_user_id()
+    store = get_log_store()
+    version = store.version(user_id)
+    if not version:
+        st.write("Belum ada log pengingat.")
+        return
 
-# Menambahkan pengingat ke daftar
-if 'reminders' not in st.session_state:
-    st.session_state.reminders = []
-
-if st.button("Tambah Pengingat"):
-    if message:
-        reminder_time = datetime.datetime.combine(datetime.date.today(), time_input)
-        time_to_wait = set_reminder(reminder_time, message)
-        st.session_state.reminders.append((reminder_time, message))
-        st.write(f"Pengingat ditambahkan untuk {reminder_time.strftime('%H:%M:%S')}. Pengingat akan berbunyi tepat waktu.")
-
-# Menampilkan daftar pengingat yang sudah ditambahkan
-if st.session_state.reminders:
-    st.write("Daftar Pengingat Hari Ini:")
-    for reminder in st.session_state.reminders:
-        st.write(f"- {reminder[0].strftime('%H:%M:%S')}: {reminder[1]}")
-
-# Tombol untuk menyelesaikan pengingat
-if st.button("Selesai"):
-    if st.session_state.reminders:
-        st.write("Semua pengingat telah selesai.")
-        log_reminder("Semua pengingat selesai untuk hari ini.")
-        st.session_state.reminders.clear()  # Clear reminders after finished
-    else:
-        st.write("Tidak ada pengingat yang tersisa untuk hari ini.")
-
-# Menampilkan log pengingat
-if st.session_state.get("log_entries"):
     st.write("Log Pengingat:")
-    log_df = pd.DataFrame(st.session_state.log_entries)
-    st.dataframe(log_df)  # Display log as a table
-
-    # Tambahkan tombol untuk download log sebagai file .xlsx
-    log_file = download_log()
-    if log_file:
-        st.download_button(
-            label="Download Log Pengingat (.xlsx)",
-            data=log_file,
-            file_name="log_pengingat.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-else:
-    st.write("Belum ada log pengingat.")
-
-# Start scheduler if not running
-if not scheduler.running:
-    scheduler.start()
+    pages = max(1, -(-store.count(user_id) // PAGE_SIZE))
+    page = st.number_input(f"Halaman (dari {pages})", min_value=1, max_value=pages, value=1, key="log_page")
+    st.dataframe(pd.DataFrame(store.page(user_id, page), columns=COLUMNS))  # Display log as a table
+
+    # The exports are built only when a button is clicked (Streamlit runs the callables then),
+    # not on every rerun of the page
+    col1, col2 = st.columns(2)
+    col1.download_button(
+        label="Download Log Pengingat (.xlsx)",
+        data=lambda: xlsx_export(user_id, version),
+        file_name="log_pengingat.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    col2.download_button(
+        label="Download Log Pengingat (.csv)",
+        data=lambda: b"".join(csv_export(user_id)),
+        file_name="log_pengingat.csv",
+        mime="text/csv"
+    )
+
+# Start the shared scheduler (once per process) and register the periodic job under a fixed ID
+def start_scheduler():
+    from playback_queue import get_player
+    get_player()  # the reminder audio thread is ready before the first job fires
+    scheduler_service.get_scheduler()
+    scheduler_service.schedule_interval("system:hourly", "reminder:send_hourly_reminders", hours=1)
 
 # Fitur pengingat yang terjadi setiap jam
 def send_hourly_reminders():
@@ -148,6 +112,49 @@ def send_hourly_reminders():
         return hourly_reminder
     return None
 
-# Periodik reminder setiap jam
-scheduler.add_job(send_hourly_reminders, 'interval', hours=1)
+# Streamlit UI (only when run as its own page: streamlit run reminder.py)
+def main():
+    start_scheduler()
+    st.title("Pengingat Kesehatan Lansia")
+
+    # Teks penjelasan
+    st.write("Ini adalah pengingat untuk membantu menjaga kesehatan Anda. Anda bisa mengatur waktu dan pesan pengingat untuk kegiatan Anda.")
 
+    # Input waktu reminder dengan komponen waktu
+    time_input = st.time_input("Pilih Waktu Pengingat", value=datetime.time(9, 0))  # default jam 9 pagi
+    message = st.text_input("Pesan Pengingat (misal: Waktunya minum obat)")
+
+    # Menambahkan pengingat ke daftar (dipulihkan dari penjadwal setelah restart)
+    if 'reminders' not in st.session_state:
+        st.session_state.reminders = scheduler_service.list_reminders()
+
+    if st.button("Tambah Pengingat"):
+        if message:
+            reminder_time = datetime.datetime.combine(datetime.date.today(), time_input)
+            job_id = set_reminder(reminder_time, message)
+            if all(reminder[2] != job_id for reminder in st.session_state.reminders):
+                st.session_state.reminders.append((reminder_time, message, job_id))
+            st.write(f"Pengingat ditambahkan untuk {reminder_time.strftime('%H:%M:%S')}. Pengingat akan berbunyi tepat waktu.")
+
+    # Menampilkan daftar pengingat yang sudah ditambahkan
+    if st.session_state.reminders:
+        st.write("Daftar Pengingat Hari Ini:")
+        for reminder in st.session_state.reminders:
+            st.write(f"- {reminder[0].strftime('%H:%M:%S')}: {reminder[1]}")
+
+    # Tombol untuk menyelesaikan pengingat
+    if st.button("Selesai"):
+        if st.session_state.reminders:
+            st.write("Semua pengingat telah selesai.")
+            log_reminder("Semua pengingat selesai untuk hari ini.")
+            for reminder in st.session_state.reminders:
+                cancel_reminder(reminder[2])
+            st.session_state.reminders.clear()  # Clear reminders after finished
+        else:
+            st.write("Tidak ada pengingat yang tersisa untuk hari ini.")
+
+    # Menampilkan log pengingat
+    show_log()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import uuid
+import hashlib
+import datetime
+import threading
+import streamlit as st
+import metrics
+
+# One long-lived reminder scheduler per process, with jobs persisted in SQLite so they survive
+# restarts. Job IDs are derived from (user, time, message), so re-adding is always idempotent.
+REMINDER_DB = os.getenv("REMINDER_DB", "reminders.sqlite")
+MISFIRE_GRACE_SECONDS = int(os.getenv("REMINDER_MISFIRE_GRACE", "600"))
+DEFAULT_USER = os.getenv("VOCACARE_USER_ID", "default")
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+# Function for the user whose reminders the current session manages. Each browser session gets
+# its own ID, kept in the URL (?user=...) so a reload or bookmark finds the same reminders.
+# Outside a Streamlit session (scheduler jobs, scripts) it is VOCACARE_USER_ID.
+def current_user_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    if get_script_run_ctx() is None:
+        return DEFAULT_USER
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = st.query_params.get("user") or uuid.uuid4().hex[:12]
+        st.query_params["user"] = st.session_state.user_id
+    return st.session_state.user_id
+
+
+# Function for the idempotent job ID of one reminder
+def reminder_job_id(user_id, run_at, message):
+    digest = hashlib.sha1(f"{run_at.isoformat()}|{message}".encode("utf-8")).hexdigest()[:16]
+    return f"reminder:{user_id}:{digest}"
+
+
+# Job target; referenced by name so the SQLite job store can persist it. It only queues the
+# reminder for the playback thread, so the scheduler worker is free again right away.
+def fire_reminder(user_id, message, run_at=None):
+    from reminder import queue_reminder
+    queue_reminder(message, user_id=user_id, due=run_at)
+
+
+def _on_missed(event):
+    metrics.inc("scheduler_missed")
+    print(f"Reminder {event.job_id} missed its run time {event.scheduled_run_time}")
+
+
+# Fire lag: how late a job was handed to the executor compared with its scheduled time
+def _on_submitted(event):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    job = "reminder" if event.job_id.startswith("reminder:") else event.job_id
+    for run_time in event.scheduled_run_times:
+        metrics.observe("scheduler_fire_lag", max(0.0, (now - run_time).total_seconds()), job=job)
+
+
+# Function for the process-wide scheduler, created and started on first use
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from apscheduler.schedulers.background import BackgroundScheduler
+            from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+            from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+
+            scheduler = BackgroundScheduler(
+                jobstores={"default": SQLAlchemyJobStore(url=f"sqlite:///{REMINDER_DB}")},
+                job_defaults={
+                    "coalesce": True,  # a backlog of missed runs fires once, not once per run
+                    "misfire_grace_time": MISFIRE_GRACE_SECONDS,
+                    "max_instances": 1,
+                },
+            )
+            scheduler.add_listener(_on_missed, EVENT_JOB_MISSED)
+            scheduler.add_listener(_on_submitted, EVENT_JOB_SUBMITTED)
+            scheduler.start()
+            _scheduler = scheduler
+        return _scheduler
+
+
+# Function for scheduling a one-off reminder; returns its job ID (same input, same job)
+def schedule_reminder(run_at, message, user_id=None):
+    user_id = user_id or current_user_id()
+    job_id = reminder_job_id(user_id, run_at, message)
+    get_scheduler().add_job(
+        "scheduler_service:fire_reminder", "date", run_date=run_at,
+        args=[user_id, message, run_at], id=job_id, name=message, replace_existing=True,
+    )
+    return job_id
+
+
+# Function for scheduling a recurring job under a fixed ID. An unchanged job is left alone:
+# re-adding restarts the interval, so a page that reruns often would keep pushing it back.
+def schedule_interval(job_id, func, **interval):
+    scheduler = get_scheduler()
+    job = scheduler.get_job(job_id)
+    if job is None or job.func_ref != func or getattr(job.trigger, "interval", None) != datetime.timedelta(**interval):
+        scheduler.add_job(func, "interval", id=job_id, replace_existing=True, **interval)
+    return job_id
+
+
+def cancel_reminder(job_id):
+    from apscheduler.jobstores.base import JobLookupError
+    try:
+        get_scheduler().remove_job(job_id)
+        return True
+    except JobLookupError:
+        return False  # already fired or cancelled
+
+
+# Function for a user's pending reminders as (run time, message, job ID), soonest first
+def list_reminders(user_id=None):
+    prefix = f"reminder:{user_id or current_user_id()}:"
+    reminders = []
+    for job in get_scheduler().get_jobs():
+        if job.id.startswith(prefix) and job.next_run_time is not None:
+            run_at = job.next_run_time.replace(tzinfo=None) if job.next_run_time.tzinfo else job.next_run_time
+            reminders.append((run_at, job.args[1], job.id))
+    return sorted(reminders, key=lambda r: r[0])
@@ -1,15 +1,108 @@
 import os
-from twilio.rest import Client
+import json
+import time
+import random
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from clients import is_retryable
 
-account_sid = os.getenv("account_sid")
-auth_token = os.getenv("auth_token")
-client = Client(account_sid, auth_token)
+# In-process SOS dispatch: one pre-warmed Twilio client with a pooled HTTP session, sending to
+# every emergency contact at once. Each contact is retried on its own, so one slow or failing
+# number never delays the others.
+FROM_NUMBER = os.getenv("TWILIO_WHATSAPP_FROM", "whatsapp:+14155238886")
+CONTENT_SID = os.getenv("SOS_CONTENT_SID", "HXcbb3da70a852d2593972b7b122bd1f46")
+SOS_CONTACTS = [number.strip() for number in os.getenv("SOS_CONTACTS", "+6281513365871").split(",") if number.strip()]
+SOS_ATTEMPTS = int(os.getenv("SOS_ATTEMPTS", "3"))
+SOS_BACKOFF = float(os.getenv("SOS_BACKOFF", "0.5"))
+SOS_TIMEOUT = float(os.getenv("SOS_TIMEOUT", "10"))
+TWILIO_BASE_URL = os.getenv("TWILIO_BASE_URL")  # e.g. a fakes.FakeTwilioServer URL
 
-message = client.messages.create(
-  from_='whatsapp:+14155238886',
-  content_sid='HXcbb3da70a852d2593972b7b122bd1f46',
-  content_variables='{"1":"12/1","2":"3pm"}',
-  to='whatsapp:+6281513365871'
-)
 
-print(message.sid)
+# Function for the template variables of the SOS message (date and time of the alert)
+def sos_variables(now=None):
+    now = now or datetime.datetime.now()
+    return json.dumps({"1": now.strftime("%d/%m"), "2": now.strftime("%H:%M")})
+
+
+class SOSDispatcher:
+    """Sends the SOS message to all contacts concurrently and reports per-contact status."""
+
+    def __init__(self, account_sid=None, auth_token=None, base_url=TWILIO_BASE_URL,
+                 attempts=SOS_ATTEMPTS, backoff=SOS_BACKOFF, max_workers=8):
+        from clients import make_twilio_client
+
+        self.client = make_twilio_client(account_sid, auth_token, pool_size=max_workers,
+                                         timeout=SOS_TIMEOUT, base_url=base_url)
+        self.base_url = self.client.api.base_url
+        self.session = self.client.http_client.session
+        self.attempts = attempts
+        self.backoff = backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sos")
+
+    # Function for opening the TLS connection ahead of time, so the first SOS skips the handshake
+    def warm(self):
+        try:
+            self.session.head(self.base_url, timeout=SOS_TIMEOUT)
+        except Exception:
+            pass  # warming is best-effort; sending will connect on its own
+
+    # Function for sending to one contact with retries; returns its delivery status
+    def send_one(self, number, variables):
+        start = time.perf_counter()
+        status = {"to": number, "status": "gagal", "sid": None, "attempts": 0, "error": None}
+        for attempt in range(1, self.attempts + 1):
+            status["attempts"] = attempt
+            try:
+                with metrics.span("twilio_send", channel="sos"):
+                    message = self.client.messages.create(
+                        from_=FROM_NUMBER,
+                        content_sid=CONTENT_SID,
+                        content_variables=variables,
+                        to=f"whatsapp:{number}",
+                    )
+                status.update(status="terkirim", sid=message.sid, error=None)
+                break
+            except Exception as e:
+                metrics.inc("sos_send_errors")
+                status["error"] = str(e)
+                if attempt == self.attempts or not is_retryable(e):
+                    break
+                # Exponential backoff with jitter so retries from many contacts don't line up
+                time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        status["seconds"] = time.perf_counter() - start
+        metrics.inc("sos_messages", status=status["status"])
+        return status
+
+    # Function for sending to every contact at once; statuses come back in contact order
+    def dispatch(self, contacts=None, variables=None):
+        contacts = contacts or SOS_CONTACTS
+        variables = variables or sos_variables()
+        with metrics.span("sos_dispatch"):
+            futures = [self._pool.submit(self.send_one, number, variables) for number in contacts]
+            return [future.result() for future in futures]
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+# Function for the process-wide dispatcher; the first call builds and warms it in the background
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = SOSDispatcher()
+            threading.Thread(target=_dispatcher.warm, name="sos-warm", daemon=True).start()
+        return _dispatcher
+
+
+# Function for sending the SOS to all configured contacts
+def send_sos(contacts=None):
+    return get_dispatcher().dispatch(contacts)
+
+
+if __name__ == "__main__":
+    for result in send_sos():
+        print(result["to"], result["status"], result["sid"] or result["error"])
@@ -0,0 +1,145 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+from answer_cache import normalize_prompt
+
+# Speculative replies from interim transcripts. Once a partial result is stable enough, its
+# intent is matched and the predefined reply is synthesized right away (optionally Gemini is
+# asked too). When the final transcript arrives the speculation is committed if it still
+# applies (same intent, or the same normalized words for Gemini), otherwise it is discarded.
+MIN_STABILITY = float(os.getenv("SPECULATION_MIN_STABILITY", "0.5"))
+SPECULATE_LLM = os.getenv("SPECULATE_LLM", "0") == "1"  # Gemini calls cost money when wasted
+
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculate")
+
+
+class SpeculationStats:
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.wasted = 0
+        self._lock = threading.Lock()
+
+    def record(self, started=0, hits=0, wasted=0):
+        with self._lock:
+            self.started += started
+            self.hits += hits
+            self.wasted += wasted
+        for name, count in (("started", started), ("hit", hits), ("wasted", wasted)):
+            if count:
+                metrics.inc("speculations", count, outcome=name)
+
+    def as_dict(self):
+        with self._lock:
+            settled = self.hits + self.wasted
+            return {"started": self.started, "hits": self.hits, "wasted": self.wasted,
+                    "hit_rate": self.hits / settled if settled else 0.0,
+                    "waste_ratio": self.wasted / self.started if self.started else 0.0}
+
+
+# Process-wide speculation outcomes
+speculation_stats = SpeculationStats()
+
+
+class Speculation:
+    def __init__(self, text, intent, answer, audio):
+        self.text = text
+        self.key = normalize_prompt(text)
+        self.intent = intent  # intent name, or None for a Gemini speculation
+        self.answer = answer  # str, or a future for a Gemini speculation
+        self.audio = audio    # future with the synthesized reply
+
+
+class Speculator:
+    """Feed it interim results with on_interim(); call resolve() with the final transcript."""
+
+    def __init__(self, memory, synthesize=None, llm=None, speculate_llm=SPECULATE_LLM, min_stability=MIN_STABILITY):
+        import voicebot
+        self.voicebot = voicebot
+        self.memory = memory
+        self.synthesize = synthesize or voicebot.synthesize_audio
+        self.llm = llm
+        self.speculate_llm = speculate_llm
+        self.min_stability = min_stability
+        self.speculations = []
+        self._lock = threading.Lock()
+
+    def on_interim(self, text, stability):
+        key = normalize_prompt(text)
+        if stability < self.min_stability or not key:
+            return
+        with self._lock:
+            if any(s.key == key for s in self.speculations):
+                return
+            intent = self.voicebot.intent_matcher.match(text)
+            if intent is not None:
+                if any(s.intent == intent["name"] for s in self.speculations):
+                    return  # the reply for this intent is already being prepared
+                audio = _pool.submit(self.synthesize, intent["response"])
+                self.speculations.append(Speculation(text, intent["name"], intent["response"], audio))
+            elif self.speculate_llm:
+                # Only the latest wording is worth a Gemini call; older guesses are dropped
+                superseded = [s for s in self.speculations if s.intent is None]
+                self.speculations = [s for s in self.speculations if s.intent is not None]
+                self._settle(superseded, None)
+                answer = _pool.submit(self._generate, text)
+                audio = _pool.submit(lambda: self.synthesize(answer.result()))
+                self.speculations.append(Speculation(text, None, answer, audio))
+            else:
+                return
+        speculation_stats.record(started=1)
+
+    # Function for a Gemini answer to the partial text, without touching the conversation memory
+    def _generate(self, text):
+        context = "\n".join(line for line in (self.memory.context(), f"User: {text}") if line)
+        llm = self.llm or self.voicebot.get_gemini_model()
+        return llm.generate_content([self.voicebot.casual_prompt(context)]).text.strip()
+
+    def _pick(self, final_text):
+        intent = self.voicebot.intent_matcher.match(final_text)
+        key = normalize_prompt(final_text)
+        for speculation in self.speculations:
+            if intent is not None and speculation.intent == intent["name"]:
+                return speculation
+            if intent is None and speculation.intent is None and speculation.key == key:
+                return speculation
+        return None
+
+    # Function for the reply to the final transcript: (answer, audio bytes, hit). The turn is recorded
+    # in memory exactly as generate_response would; speculations that don't apply are cancelled.
+    def resolve(self, final_text):
+        with self._lock:
+            chosen = self._pick(final_text) if final_text else None
+            speculations, self.speculations = self.speculations, []
+        if not final_text:
+            self._settle(speculations, None)
+            return "", None, False
+
+        answer, context, history = self.voicebot.prepare_response(final_text, self.memory)
+        if chosen is not None and chosen.intent is None and answer is None:
+            metrics.inc("responses", source="llm")
+            answer = self.voicebot.finish_response(final_text, chosen.answer.result(), history, self.memory)
+        elif chosen is None or answer != chosen.answer:
+            chosen = None  # e.g. the final question was answered from the cache instead
+        self._settle(speculations, chosen)
+        if chosen is not None:
+            # bytes: bundled phrases come back as memoryviews, which st.audio rejects
+            return answer, bytes(chosen.audio.result()), True
+
+        # Nothing usable was prepared: the normal path
+        if answer is None:
+            metrics.inc("responses", source="llm")
+            llm = self.llm or self.voicebot.get_gemini_model()
+            with metrics.span("llm", mode="batch"):
+                response = llm.generate_content([self.voicebot.casual_prompt(context)])
+            answer = self.voicebot.finish_response(final_text, response.text.strip(), history, self.memory)
+        return answer, bytes(self.synthesize(answer)), False
+
+    def _settle(self, speculations, chosen):
+        for speculation in speculations:
+            if speculation is not chosen:
+                speculation.audio.cancel()
+                if speculation.intent is None:
+                    speculation.answer.cancel()
+        speculation_stats.record(hits=int(chosen is not None), wasted=len(speculations) - int(chosen is not None))
@@ -0,0 +1,76 @@
+import re
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Sentence end: terminal punctuation (optionally followed by a closing quote/bracket) plus whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+MIN_SENTENCE_CHARS = 20  # shorter fragments are merged with the next sentence
+TTS_WORKERS = 3
+
+
+# Function for cutting a stream of text chunks into sentences as soon as each one is complete
+def split_sentences(text_chunks, min_chars=MIN_SENTENCE_CHARS):
+    buffer = ""
+    for chunk in text_chunks:
+        buffer += chunk
+        search_from = 0
+        while True:
+            match = _SENTENCE_END.search(buffer, search_from)
+            if match is None:
+                break
+            if match.end() < min_chars:
+                search_from = match.end()
+                continue
+            sentence = buffer[:match.end()].strip()
+            buffer = buffer[match.end():]
+            search_from = 0
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+
+_DONE = object()
+
+
+# Function for synthesizing sentences concurrently while yielding (sentence, audio) strictly in order.
+# The sentence source (e.g. a streaming LLM) is consumed on its own thread, so generation,
+# synthesis and the caller's playback all overlap.
+def pipelined_speech(sentences, synthesize, max_workers=TTS_WORKERS):
+    pending = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+
+    def produce():
+        try:
+            for sentence in sentences:
+                pending.put((sentence, executor.submit(synthesize, sentence)))
+        except Exception as e:
+            pending.put(e)
+        finally:
+            pending.put(_DONE)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            sentence, future = item
+            yield sentence, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Function for the text of a streamed Gemini response, chunk by chunk
+def stream_text(model, prompt):
+    for chunk in model.generate_content([prompt], stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # chunk without text parts (e.g. only safety metadata)
+        if text:
+            yield text
@@ -0,0 +1,27 @@
+import voicebot
+from answer_cache import AnswerCache
+from fakes import FakeLLM
+from memory import ConversationMemory
+
+
+def test_answers_are_not_shared_across_contexts_or_users():
+    cache = AnswerCache()
+    cache.put("kapan saya harus kontrol?", "Kontrol tensi setiap hari Senin.", "User: saya punya hipertensi", "u1")
+    assert cache.get("kapan saya harus kontrol", "User: saya punya hipertensi", "u1") == "Kontrol tensi setiap hari Senin."
+    assert cache.get("kapan saya harus kontrol", "User: saya punya hipertensi", "u2") is None
+    assert cache.get("kapan saya harus kontrol", "User: saya punya diabetes", "u1") is None
+    assert cache.get("kapan saya harus kontrol", "", "u1") is None
+
+
+def test_personal_answer_does_not_reach_another_session(monkeypatch):
+    monkeypatch.setattr(voicebot, "answer_cache", AnswerCache())
+    first = ConversationMemory(user_id="u1")
+    first.add("User", "nama saya Siti dan saya punya diabetes")
+    first.add("Vocacare", "Baik, Bu Siti.")
+    monkeypatch.setattr(voicebot, "get_gemini_model", lambda: FakeLLM("Bu Siti sebaiknya makan sayur rebus.", first_token_latency=0))
+    voicebot.generate_response("apa yang sebaiknya saya makan", first)
+
+    second = ConversationMemory(user_id="u2")
+    monkeypatch.setattr(voicebot, "get_gemini_model", lambda: FakeLLM("Makanan bergizi seimbang.", first_token_latency=0))
+    assert voicebot.generate_response("apa yang sebaiknya saya makan", second) == "Makanan bergizi seimbang."
+    assert voicebot.answer_cache.stats()["hits"] == 0
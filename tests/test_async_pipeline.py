@@ -0,0 +1,81 @@
+import asyncio
+import importlib
+import datetime
+from types import SimpleNamespace
+import pytest
+import async_pipeline
+import tts_cache
+import voicebot
+from bench_pipeline import NullTTSCache
+from memory import ConversationMemory
+from recurrence import Rule, RecurrenceEngine, UTC
+
+
+class SlowClients:
+    """Async Speech/TTS stand-ins that take `stt` and `tts` seconds."""
+
+    def __init__(self, stt=0.0, tts=0.0):
+        self.speech = SimpleNamespace(recognize=self._recognize)
+        self.tts = SimpleNamespace(synthesize_speech=self._synthesize)
+        self.stt_seconds, self.tts_seconds = stt, tts
+
+    async def _recognize(self, config=None, audio=None):
+        await asyncio.sleep(self.stt_seconds)
+        return SimpleNamespace(results=[])
+
+    async def _synthesize(self, input=None, voice=None, audio_config=None):
+        await asyncio.sleep(self.tts_seconds)
+        return SimpleNamespace(audio_content=b"<mp3>")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # Imported up front, so the import time doesn't count against the stage timeouts
+    for module in ("google.cloud.speech", "google.cloud.texttospeech"):
+        importlib.import_module(module)
+    engine = RecurrenceEngine()
+    monkeypatch.setattr(voicebot, "reminder_engine", engine)
+    monkeypatch.setattr(voicebot, "daily_reminders", {})
+    monkeypatch.setattr(tts_cache, "_default_cache", NullTTSCache())
+    monkeypatch.setattr(async_pipeline, "STT_TIMEOUT", 0.2)
+    monkeypatch.setattr(async_pipeline, "TTS_TIMEOUT", 0.2)
+    rule = Rule("u:hydration", "u", voicebot.hourly_reminder, "every", every_hours=2)
+    engine.add(rule)
+    engine.restore("u", [(datetime.datetime.now(UTC), rule)])
+    return engine
+
+
+def run_turn(clients):
+    return asyncio.run(async_pipeline.voice_turn(clients, b"\0" * 3200, ConversationMemory(), "u", "Asia/Jakarta"))
+
+
+def test_reminder_is_delivered_with_the_turn(engine):
+    turn = run_turn(SlowClients())
+    assert voicebot.hourly_reminder in turn["reminder"]
+    assert engine.take("u") == []
+
+
+def test_reminder_tts_timeout_keeps_the_reminder(engine):
+    turn = run_turn(SlowClients(tts=1.0))
+    assert turn["reminder"] is None
+    assert [rule.message for _, rule in engine.take("u")] == [voicebot.hourly_reminder]
+
+
+@pytest.mark.parametrize("tts", [0.0, 1.0])  # reminder ready or still synthesizing when STT times out
+def test_stt_timeout_keeps_the_reminder(engine, tts):
+    with pytest.raises(asyncio.TimeoutError):
+        run_turn(SlowClients(stt=1.0, tts=tts))
+    assert [rule.message for _, rule in engine.take("u")] == [voicebot.hourly_reminder]
+
+
+def test_show_async_turn_reports_a_timeout(monkeypatch):
+    class TimingOutRunner:
+        def run_turn(self, pcm):
+            raise asyncio.TimeoutError()
+
+    warnings = []
+    monkeypatch.setattr(async_pipeline, "get_runner", lambda: TimingOutRunner())
+    monkeypatch.setattr(voicebot.st, "warning", warnings.append)
+    voicebot.show_async_turn(b"\0" * 3200)
+    assert warnings and "coba lagi" in warnings[0]
+
@@ -0,0 +1,53 @@
+import pytest
+import audio_device
+import voicebot
+from audio_device import CaptureLease
+
+LOUD_CHUNK = b"\xff\x3f" * 1024
+
+
+class FakeDevice:
+    """Stands in for the shared input stream; every lease starts with `chunks` queued."""
+
+    overflows = 0
+    chunk = 1024
+
+    def __init__(self, chunks=()):
+        self.chunks = list(chunks)
+        self.leases = set()
+
+    def lease(self, preroll=False):
+        lease = CaptureLease(self, self.chunks)
+        self.leases.add(lease)
+        return lease
+
+    def release(self, lease):
+        self.leases.discard(lease)
+
+
+def test_recorder_releases_the_lease_when_plotting_fails(monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    device = FakeDevice()
+    monkeypatch.setattr(audio_device, "get_device", lambda: device)
+
+    def broken_subplots(*args, **kwargs):
+        raise RuntimeError("no display")
+
+    monkeypatch.setattr(plt, "subplots", broken_subplots)
+    with pytest.raises(RuntimeError):
+        voicebot.record_audio_with_visualization(duration=1)
+    assert not device.leases
+
+
+def test_microphone_chunks_release_the_lease_when_closed_early(monkeypatch):
+    device = FakeDevice([LOUD_CHUNK] * 20)
+    monkeypatch.setattr(audio_device, "get_device", lambda: device)
+
+    chunks = voicebot.microphone_chunks(duration=1)
+    next(chunks)
+    assert device.leases
+    chunks.close()
+    assert not device.leases
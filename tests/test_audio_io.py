@@ -0,0 +1,25 @@
+import audio_io
+
+
+def test_server_playback_is_off_by_default(monkeypatch):
+    played = []
+    monkeypatch.setattr(audio_io, "play_bytes", played.append)
+    assert audio_io.play_on_server(b"<mp3>") is False
+    assert played == []
+
+
+def test_server_playback_errors_do_not_abort_the_turn(monkeypatch):
+    def no_device(audio):
+        raise OSError("no audio device")
+
+    monkeypatch.setattr(audio_io, "play_bytes", no_device)
+    assert audio_io.play_on_server(b"<mp3>", enabled=True) is False
+
+
+def test_joined_clips_are_bytes():
+    assert audio_io.join_clips([memoryview(b"ab"), b"cd"]) == b"abcd"
+
+
+def test_clip_duration_of_local_and_cloud_clips():
+    assert audio_io.clip_duration(audio_io.pcm_to_wav(b"\0" * 32000)) == 1.0
+    assert audio_io.clip_duration(b"\xff\xf3" + b"\0" * 3998) == 1.0  # undecodable: estimated from 32 kbps
@@ -0,0 +1,52 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import engines
+import voicebot
+from fakes import FakeSpeechClient
+from engines import GoogleSTT, HedgedEngine
+
+
+class StuckSTT:
+    name = "google"
+
+    def __init__(self, release):
+        self.release = release
+
+    def recognize(self, pcm):
+        self.release.wait()
+        return "terlambat"
+
+
+class LocalSTT:
+    name = "local"
+
+    def recognize(self, pcm):
+        return "halo"
+
+
+def test_fallback_is_not_held_up_by_stuck_primaries(monkeypatch):
+    release = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(engines, "_pool", pool)
+    try:
+        pool.submit(release.wait)  # every primary worker is busy with a call that doesn't return
+        threading.Timer(2, release.set).start()  # a shared pool would only free up after this
+        start = time.monotonic()
+        assert HedgedEngine(StuckSTT(release), LocalSTT(), 0.05, "stt").recognize(b"") == "halo"
+        assert time.monotonic() - start < 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_google_calls_give_up_at_their_deadline(monkeypatch):
+    from google.api_core.exceptions import DeadlineExceeded
+
+    monkeypatch.setattr(voicebot, "get_speech_client", lambda: FakeSpeechClient("halo", latency=5))
+    monkeypatch.setattr(engines, "GOOGLE_STT_TIMEOUT", 0.1)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        GoogleSTT().recognize(b"\0" * 3200)
+    assert time.monotonic() - start < 1
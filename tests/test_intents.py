@@ -0,0 +1,21 @@
+import pytest
+from intents import IntentMatcher
+
+matcher = IntentMatcher.from_file()
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("aku kecapekan habis jalan pagi", "capek"),
+    ("kesepiannya terasa sekali malam ini", "kesepian"),
+    ("badanku kelelahan", "capek"),
+    ("tadi kehujanan di pasar", "cuaca"),
+    ("capeknya belum hilang", "capek"),
+    ("sudah waktunya minum obatnya belum ya", "obat"),
+])
+def test_affixed_words_match_their_intent(text, intent):
+    assert matcher.match(text)["name"] == intent
+
+
+@pytest.mark.parametrize("text", ["aku mau makan", "ayo jalan-jalan ke taman", "ceritakan sesuatu dong"])
+def test_unrelated_words_stay_unmatched(text):
+    assert matcher.match(text) is None
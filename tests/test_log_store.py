@@ -0,0 +1,38 @@
+import log_store
+import reminder
+from log_store import LogStore
+
+
+def test_csv_export_yields_one_chunk_per_batch(tmp_path, monkeypatch):
+    store = LogStore(str(tmp_path / "log.sqlite"))
+    for i in range(5):
+        store.append("u", f"Minum obat {i}", "Diputar")
+    monkeypatch.setattr(log_store, "get_log_store", lambda: store)
+
+    chunks = log_store.csv_export("u", batch_size=2)
+    first = next(chunks)
+    lines = first.decode("utf-8").splitlines()
+    assert lines[0] == "Pesan Pengingat,Status,Waktu"
+    assert [line.split(",")[0] for line in lines[1:]] == ["Minum obat 0", "Minum obat 1"]  # the first batch only
+    rest = list(chunks)
+    assert b"".join([first] + rest).decode("utf-8").count("Minum obat") == 5
+
+
+def test_log_page_builds_no_export_until_asked(tmp_path, monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    store = LogStore(str(tmp_path / "log.sqlite"))
+    store.append("u", "Minum obat", "Diputar")
+    built = []
+    monkeypatch.setattr(reminder, "get_log_store", lambda: store)
+    monkeypatch.setattr(reminder, "xlsx_export", lambda *args: built.append("xlsx"))
+    monkeypatch.setattr(reminder, "csv_export", lambda *args: built.append("csv"))
+
+    def app():
+        import reminder
+        reminder.show_log("u")
+
+    at = AppTest.from_function(app).run()
+    assert not at.exception
+    assert len(at.get("download_button")) == 2
+    assert built == []
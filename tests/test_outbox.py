@@ -0,0 +1,52 @@
+import time
+import pytest
+from fakes import FakeTwilioServer
+from outbox import Outbox, twilio_sender
+
+
+@pytest.fixture
+def twilio():
+    with FakeTwilioServer() as server:
+        yield server
+
+
+def make_outbox(tmp_path, twilio, **kwargs):
+    kwargs.setdefault("rate", 100)
+    kwargs.setdefault("coalesce_seconds", 0)
+    return Outbox(str(tmp_path / "outbox.sqlite"), sender=twilio_sender(twilio.url), **kwargs)
+
+
+def test_saves_to_the_same_recipient_coalesce(tmp_path, twilio):
+    outbox = make_outbox(tmp_path, twilio, coalesce_seconds=30)
+    first = outbox.enqueue("user-a", "+62111", "pertama", coalesce_key="checklist:user-a:+62111")
+    second = outbox.enqueue("user-a", "+62111", "kedua", coalesce_key="checklist:user-a:+62111")
+    assert first == second
+    assert outbox.pending_count() == 1
+
+
+def test_same_key_different_recipients_stay_separate(tmp_path, twilio):
+    outbox = make_outbox(tmp_path, twilio)
+    a = outbox.enqueue("default", "+62111", "pesan A", coalesce_key="checklist:default")
+    b = outbox.enqueue("default", "+62222", "pesan B", coalesce_key="checklist:default")
+    assert a != b
+
+    outbox.process_batch()
+    sent = {message["To"]: message["Body"] for message in twilio.messages}
+    assert sent == {"whatsapp:+62111": "pesan A", "whatsapp:+62222": "pesan B"}
+    assert outbox.status(a)["status"] == outbox.status(b)["status"] == "sent"
+
+
+def test_transient_failures_are_retried_and_rejections_fail(tmp_path):
+    with FakeTwilioServer(fail_first={"+62111": 1}, reject={"+62999"}) as twilio:
+        outbox = make_outbox(tmp_path, twilio, backoff=0)
+        retried = outbox.enqueue("u", "+62111", "halo")
+        rejected = outbox.enqueue("u", "+62999", "halo")
+
+        outbox.process_batch()
+        assert outbox.status(retried)["status"] == "pending"
+        assert outbox.status(rejected)["status"] == "failed"
+
+        time.sleep(0.01)
+        outbox.process_batch()
+        state = outbox.status(retried)
+        assert state["status"] == "sent" and state["attempts"] == 2
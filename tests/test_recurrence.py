@@ -0,0 +1,82 @@
+import datetime
+from zoneinfo import ZoneInfo
+import voicebot
+from recurrence import Rule, RecurrenceEngine, UTC
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+
+
+def at(hour, minute, second=0, day=1):
+    return datetime.datetime(2024, 5, day, hour, minute, second, tzinfo=JAKARTA)
+
+
+def lunch(user_id="u"):
+    return Rule(f"{user_id}:lunch", user_id, "Waktunya makan siang!", "daily", hour=12, minute=0, timezone="Asia/Jakarta")
+
+
+def test_missed_occurrences_are_caught_up_once():
+    engine = RecurrenceEngine()
+    engine.add(lunch(), now=at(9, 0))
+    assert [rule.message for _, rule in engine.take("u", now=at(14, 30))] == ["Waktunya makan siang!"]
+    assert engine.take("u", now=at(14, 31)) == []
+
+
+def test_occurrences_older_than_the_catch_up_window_are_dropped():
+    engine = RecurrenceEngine(catch_up_window=datetime.timedelta(hours=3))
+    engine.add(lunch(), now=at(9, 0))
+    assert engine.take("u", now=at(15, 30)) == []
+
+
+def test_inbox_of_a_user_who_never_returns_stays_bounded():
+    engine = RecurrenceEngine(inactive_after=datetime.timedelta(days=365))
+    engine.add(lunch("gone"), now=at(9, 0))
+    engine.add(lunch("active"), now=at(9, 0))
+    for day in range(1, 20):
+        engine.take("active", now=at(12, 1, day=day))
+    assert len(engine.inbox["gone"]) <= 1
+
+
+def test_inactive_users_are_forgotten():
+    engine = RecurrenceEngine(inactive_after=datetime.timedelta(days=7))
+    engine.add(lunch("gone"), now=at(9, 0))
+    engine.take("gone", now=at(9, 1))
+    engine.add(lunch("active"), now=at(9, 0))
+    engine.take("active", now=at(9, 0, day=10))
+    assert "gone:lunch" not in engine and "gone" not in engine.inbox
+    assert "active:lunch" in engine
+
+
+def test_builtin_reminder_fires_during_its_own_minute(monkeypatch):
+    now = datetime.datetime.now(JAKARTA)
+    monkeypatch.setattr(voicebot, "reminder_engine", RecurrenceEngine())
+    monkeypatch.setattr(voicebot, "daily_reminders", {(now.hour, now.minute): "Waktunya minum obat!"})
+
+    parts = voicebot.reminder_parts("u", "Asia/Jakarta")
+    assert parts is not None and "Waktunya minum obat!" in parts
+    assert voicebot.reminder_parts("u", "Asia/Jakarta") is None  # announced once
+
+
+def test_timezone_change_keeps_reminders_since_the_last_turn(monkeypatch):
+    engine = RecurrenceEngine()
+    monkeypatch.setattr(voicebot, "reminder_engine", engine)
+    now = datetime.datetime.now(ZoneInfo("Asia/Makassar"))
+    monkeypatch.setattr(voicebot, "daily_reminders", {(now.hour, now.minute): "Waktunya makan siang!"})
+
+    # The previous turn was an hour ago, in Jakarta time, where the reminder is still an hour off
+    engine.add(Rule("u:hydration", "u", voicebot.hourly_reminder, "every", every_hours=2), now=now)
+    engine.take("u", now=now.astimezone(UTC) - datetime.timedelta(hours=1))
+    parts = voicebot.reminder_parts("u", "Asia/Makassar")
+    assert parts is not None and "Waktunya makan siang!" in parts
+
+
+def test_each_streamlit_session_gets_its_own_user_id():
+    from streamlit.testing.v1 import AppTest
+
+    def app():
+        import streamlit as st
+        from scheduler_service import current_user_id
+        st.write(current_user_id())
+
+    first, second = AppTest.from_function(app).run(), AppTest.from_function(app).run()
+    assert first.markdown[0].value != second.markdown[0].value
+    assert first.query_params["user"] == first.markdown[0].value  # kept in the URL across reloads
@@ -0,0 +1,26 @@
+import time
+import pytest
+import scheduler_service
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_service, "REMINDER_DB", str(tmp_path / "reminders.sqlite"))
+    monkeypatch.setattr(scheduler_service, "_scheduler", None)
+    scheduler = scheduler_service.get_scheduler()
+    yield scheduler
+    scheduler.shutdown(wait=False)
+
+
+def test_rescheduling_an_unchanged_interval_job_keeps_its_next_run(scheduler):
+    scheduler_service.schedule_interval("system:hourly", "reminder:send_hourly_reminders", hours=1)
+    next_run = scheduler.get_job("system:hourly").next_run_time
+    time.sleep(0.05)
+    scheduler_service.schedule_interval("system:hourly", "reminder:send_hourly_reminders", hours=1)
+    assert scheduler.get_job("system:hourly").next_run_time == next_run
+
+
+def test_changing_the_interval_replaces_the_job(scheduler):
+    scheduler_service.schedule_interval("system:hourly", "reminder:send_hourly_reminders", hours=1)
+    scheduler_service.schedule_interval("system:hourly", "reminder:send_hourly_reminders", hours=2)
+    assert scheduler.get_job("system:hourly").trigger.interval.total_seconds() == 7200
@@ -0,0 +1,30 @@
+from fakes import FakeTwilioServer
+from sos import SOSDispatcher
+
+
+def dispatch(server, contacts, attempts=3):
+    dispatcher = SOSDispatcher("AC123", "token", base_url=server.url, attempts=attempts, backoff=0)
+    return {result["to"]: result for result in dispatcher.dispatch(contacts, variables="{}")}
+
+
+def test_each_contact_is_retried_on_its_own():
+    with FakeTwilioServer(fail_first={"+622": 2}) as server:
+        results = dispatch(server, ["+621", "+622"])
+    assert results["+621"]["status"] == "terkirim" and results["+621"]["attempts"] == 1
+    assert results["+622"]["status"] == "terkirim" and results["+622"]["attempts"] == 3
+    assert len(server.messages) == 2
+
+
+def test_rejected_numbers_fail_without_retries_and_do_not_block_others():
+    with FakeTwilioServer(reject={"+629"}) as server:
+        results = dispatch(server, ["+621", "+629"])
+    assert results["+621"]["status"] == "terkirim"
+    assert results["+629"]["status"] == "gagal" and results["+629"]["attempts"] == 1
+    assert server.attempts["+629"] == 1
+
+
+def test_contact_gives_up_after_its_attempts():
+    with FakeTwilioServer(fail_first={"+622": 5}) as server:
+        results = dispatch(server, ["+622"], attempts=2)
+    assert results["+622"]["status"] == "gagal" and results["+622"]["attempts"] == 2
+    assert results["+622"]["error"]
@@ -0,0 +1,52 @@
+import pytest
+import phrase_bundle
+import voicebot
+from fakes import FakeLLM, FakeSpeechClient
+from memory import ConversationMemory
+from answer_cache import AnswerCache
+from speculation import Speculator
+from tts_cache import speech_key
+
+
+@pytest.fixture
+def bundled(tmp_path, monkeypatch):
+    from google.cloud import texttospeech
+
+    # Every intent reply pre-rendered, as after `python phrase_bundle.py build`
+    phrases = []
+    for intent in voicebot.intent_matcher.intents:
+        synthesis_input = texttospeech.SynthesisInput(text=intent["response"])
+        key = speech_key(synthesis_input, voicebot.voice_params(), voicebot.audio_params())
+        phrases.append((key, f"<mp3:{intent['name']}>".encode("utf-8")))
+    path = str(tmp_path / "phrases.bundle")
+    phrase_bundle.write_bundle(path, phrases)
+    bundle = phrase_bundle.PhraseBundle(path)
+    monkeypatch.setattr(phrase_bundle, "_bundle", bundle)
+    monkeypatch.setattr(phrase_bundle, "_bundle_loaded", True)
+    yield bundle
+    bundle.close()
+
+
+def speculate(text, speculator):
+    chunks = [b"\0" * 2048] * (4 * len(text.split()) + 2)
+    final = voicebot.streaming_speech_to_text(chunks, client=FakeSpeechClient(text), on_interim=speculator.on_interim)
+    return speculator.resolve(final)
+
+
+def test_bundled_intent_reply_is_returned_as_bytes(bundled):
+    assert isinstance(voicebot.synthesize_audio(voicebot.intent_matcher.match("kesepian")["response"]), memoryview)
+
+    memory = ConversationMemory()
+    answer, audio, hit = speculate("aku merasa kesepian hari ini", Speculator(memory))
+    assert hit
+    assert type(audio) is bytes and audio == b"<mp3:kesepian>"
+    assert answer == voicebot.intent_matcher.match("kesepian")["response"]
+    assert memory.context().startswith("User: aku merasa kesepian hari ini")
+
+
+def test_llm_speculation_is_used_for_the_same_words(monkeypatch):
+    monkeypatch.setattr(voicebot, "answer_cache", AnswerCache())  # a cached answer would skip the speculation
+    speculator = Speculator(ConversationMemory(), synthesize=lambda text: f"<{text}>".encode("utf-8"),
+                            llm=FakeLLM("Halo juga", first_token_latency=0), speculate_llm=True)
+    answer, audio, hit = speculate("apa kabar kamu pagi ini", speculator)
+    assert (answer, audio, hit) == ("Halo juga", b"<Halo juga>", True)
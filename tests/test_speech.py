@@ -0,0 +1,42 @@
+import pytest
+import voicebot
+from bench_pipeline import DEFAULT_FIXTURES, fixture_transcripts, load_fixtures, make_fixtures
+from fakes import FakeSpeechClient
+
+
+@pytest.mark.parametrize("codec", ["linear16", "flac", "ogg_opus"])
+def test_fake_recognize_sees_the_pcm_of_compressed_uploads(tmp_path, monkeypatch, codec):
+    from google.cloud import speech
+
+    fixtures = load_fixtures(make_fixtures(str(tmp_path)))
+    heard = []
+
+    def transcript(pcm):
+        heard.append(len(pcm))
+        return fixture_transcripts(fixtures)(pcm)
+
+    client = FakeSpeechClient(transcript)
+    monkeypatch.setattr(voicebot, "get_speech_client", lambda: client)
+    for pcm, expected in fixtures:
+        content, config = voicebot.recognition_request(pcm, codec)
+        response = client.recognize(config=config, audio=speech.RecognitionAudio(content=content))
+        assert response.results[0].alternatives[0].transcript == expected
+        # The latency model works on the audio duration, not the compressed size
+        assert abs(heard[-1] - len(pcm)) < 32000 * 0.1
+
+    assert sorted(t for t, _ in DEFAULT_FIXTURES) == sorted(t for _, t in fixtures)
+
+
+
+def test_fake_streaming_reveals_the_transcript_word_by_word():
+    interim = []
+    final = voicebot.streaming_speech_to_text([b"\0" * 2048] * 12, client=FakeSpeechClient("halo apa kabar"),
+                                              on_interim=lambda text, stability: interim.append(text))
+    assert final == "halo apa kabar"
+    assert interim == ["halo", "halo apa", "halo apa kabar"]
+
+
+def test_fake_streaming_stops_at_final_after_chunks():
+    client = FakeSpeechClient("halo", final_after_chunks=3)
+    assert voicebot.streaming_speech_to_text([b"\0" * 2048] * 50, client=client) == "halo"
+    assert client.chunks_received == 3
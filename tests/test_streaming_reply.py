@@ -0,0 +1,45 @@
+import voicebot
+from answer_cache import AnswerCache
+
+
+def test_streamed_turn_lands_in_the_session_memory(monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.setattr(voicebot, "answer_cache", AnswerCache())
+
+    def app():
+        import streamlit as st
+        from fakes import FakeLLM
+        from voicebot import speak_response_stream
+        llm = FakeLLM("Halo juga, senang mendengarnya. Semoga harimu menyenangkan.", first_token_latency=0, tokens_per_second=1000)
+        replies = [sentence for sentence, _ in speak_response_stream("apa kabar kamu pagi ini", llm=llm, synthesize=lambda text: b"")]
+        st.write(str(len(replies)))
+        st.write(st.session_state.conversation_memory.context())
+
+    at = AppTest.from_function(app).run()
+    assert not at.exception
+    assert at.markdown[0].value == "2"
+    context = at.markdown[1].value
+    assert "User: apa kabar kamu pagi ini" in context and "Halo juga" in context
+
+
+def test_each_sentence_reaches_the_browser_once_the_previous_one_has_played():
+    from streamlit.testing.v1 import AppTest
+
+    def app():
+        import time
+        import streamlit as st
+        from audio_io import pcm_to_wav
+        from voicebot import show_streamed_reply
+
+        clip = pcm_to_wav(b"\0" * 6400)  # 0.2 seconds
+        start = time.monotonic()
+        show_streamed_reply([("Halo.", clip), ("Apa kabar?", clip), ("Sampai jumpa.", clip)])
+        st.session_state.elapsed = time.monotonic() - start
+
+    at = AppTest.from_function(app).run()
+    assert not at.exception
+    players = at.get("audio")
+    assert len(players) == 3 and all(player.proto.autoplay for player in players)
+    assert at.markdown[0].value == "**Balasan Vocacare:** Halo. Apa kabar? Sampai jumpa."
+    assert at.session_state.elapsed >= 0.4
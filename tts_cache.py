@@ -0,0 +1,171 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import metrics
+
+# Cache location and limits (override with environment variables)
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+HOT_MAX_ITEMS = int(os.getenv("TTS_CACHE_HOT_ITEMS", "64"))
+
+
+# Function for building a content-addressed key from everything that changes the audio
+def cache_key(text, voice_name="", language_code="", gender="", encoding=""):
+    raw = "\x1f".join(str(part) for part in (text, voice_name, language_code, gender, encoding))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Disk-backed audio cache with LRU eviction and a small in-memory hot tier."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, hot_items=HOT_MAX_ITEMS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hot_items = hot_items
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()    # key -> audio bytes
+        self._index = OrderedDict()  # key -> size on disk, least recently used first
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    # Rebuild the LRU order from files left by previous runs (oldest access first)
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".audio"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-len(".audio")], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def _remember_hot(self, key, audio):
+        self._hot[key] = audio
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_items:
+            self._hot.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            audio = self._hot.get(key)
+            if audio is not None:
+                self._hot.move_to_end(key)
+                if key in self._index:
+                    self._index.move_to_end(key)
+                self.hits += 1
+                return audio
+
+            if key not in self._index:
+                self.misses += 1
+                return None
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    audio = f.read()
+                os.utime(path)  # mtime doubles as last-access time across restarts
+            except OSError:
+                self._drop(key)
+                self.misses += 1
+                return None
+
+            self._index.move_to_end(key)
+            self._remember_hot(key, audio)
+            self.hits += 1
+            return audio
+
+    def put(self, key, audio):
+        audio = bytes(audio)
+        with self._lock:
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+
+            if key in self._index:
+                self._total_bytes -= self._index[key]
+            self._index[key] = len(audio)
+            self._index.move_to_end(key)
+            self._total_bytes += len(audio)
+            self._remember_hot(key, audio)
+            self._evict()
+
+    def _drop(self, key):
+        size = self._index.pop(key, 0)
+        self._total_bytes -= size
+        self._hot.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self._drop(oldest)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "hot_entries": len(self._hot),
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+# Function for getting the process-wide cache shared by voicebot and reminder
+def get_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TTSCache()
+        return _default_cache
+
+
+# Function for the cache key of a synthesize_speech request
+def speech_key(synthesis_input, voice, audio_config):
+    return cache_key(
+        synthesis_input.text,
+        voice.name,
+        voice.language_code,
+        int(voice.ssml_gender),
+        int(audio_config.audio_encoding),
+    )
+
+
+# Function for synthesizing speech through the cache (only calls the API on a miss).
+# call_options (e.g. timeout=, retry=) are passed on to the API call.
+def synthesize_cached(client, synthesis_input, voice, audio_config, cache=None, **call_options):
+    cache = cache or get_cache()
+    key = speech_key(synthesis_input, voice, audio_config)
+    audio = cache.get(key)
+    if audio is None:
+        metrics.inc("tts_cache", result="miss")
+        with metrics.span("tts_api"):
+            response = client.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config, **call_options)
+        audio = response.audio_content
+        cache.put(key, audio)
+    else:
+        metrics.inc("tts_cache", result="hit")
+    return audio
@@ -0,0 +1,106 @@
+import os
+import numpy as np
+
+# Voice activity detection on 16-bit mono PCM, tuned for a quiet room and a laptop microphone.
+# Thresholds can be overridden with environment variables.
+SAMPLE_RATE = 16000
+FRAME_MS = 32
+ENERGY_THRESHOLD = float(os.getenv("VAD_ENERGY_THRESHOLD", "500"))  # RMS in int16 units
+TRAILING_SILENCE = float(os.getenv("VAD_TRAILING_SILENCE", "0.8"))   # seconds of silence that end a turn
+LEADING_TIMEOUT = float(os.getenv("VAD_LEADING_TIMEOUT", "4.0"))     # give up if nobody speaks this long
+MIN_SPEECH = 0.15                                                    # ignore clicks shorter than this
+
+
+# Function for per-frame RMS energy and zero-crossing rate of a PCM buffer (vectorized)
+def frame_features(samples, rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        samples = np.frombuffer(samples, dtype=np.int16)
+    frame_len = int(rate * frame_ms / 1000)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+    return rms, zcr
+
+
+# Function for the boolean speech/non-speech mask per frame
+def speech_mask(samples, rate=SAMPLE_RATE, frame_ms=FRAME_MS, energy_threshold=ENERGY_THRESHOLD):
+    rms, zcr = frame_features(samples, rate, frame_ms)
+    # Voiced speech is loud; unvoiced consonants ("s", "h") are quieter but cross zero often
+    return (rms > energy_threshold) | ((rms > energy_threshold * 0.5) & (zcr > 0.3))
+
+
+# Function for cutting leading and trailing silence (keeps a little padding); b"" if no speech
+def trim_silence(pcm, rate=SAMPLE_RATE, frame_ms=FRAME_MS, energy_threshold=ENERGY_THRESHOLD, padding=0.15):
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    mask = speech_mask(samples, rate, frame_ms, energy_threshold)
+    voiced = np.flatnonzero(mask)
+    if voiced.size == 0:
+        return b""
+
+    frame_len = int(rate * frame_ms / 1000)
+    pad = int(rate * padding)
+    start = max(0, voiced[0] * frame_len - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame_len + pad)
+    return samples[start:end].tobytes()
+
+
+# Function for splitting long audio into pieces of at most max_seconds, each cut at the
+# quietest frame in the last search_seconds of its window so words are not split in half
+def split_at_pauses(pcm, max_seconds, rate=SAMPLE_RATE, frame_ms=FRAME_MS, search_seconds=5.0):
+    samples = np.frombuffer(pcm, dtype=np.int16)
+    frame_len = int(rate * frame_ms / 1000)
+    max_len = int(rate * max_seconds)
+    pieces, start = [], 0
+    while len(samples) - start > max_len:
+        window_start = start + max(frame_len, max_len - int(rate * search_seconds))
+        rms, _ = frame_features(samples[window_start:start + max_len], rate, frame_ms)
+        cut = window_start + int(np.argmin(rms)) * frame_len if rms.size else start + max_len
+        pieces.append(samples[start:cut].tobytes())
+        start = cut
+    pieces.append(samples[start:].tobytes())
+    return pieces
+
+
+class Endpointer:
+    """Decides, chunk by chunk, when the speaker has finished talking."""
+
+    def __init__(self, rate=SAMPLE_RATE, frame_ms=FRAME_MS, energy_threshold=ENERGY_THRESHOLD,
+                 trailing_silence=TRAILING_SILENCE, leading_timeout=LEADING_TIMEOUT, min_speech=MIN_SPEECH):
+        self.rate = rate
+        self.frame_ms = frame_ms
+        self.frame_seconds = frame_ms / 1000
+        self.energy_threshold = energy_threshold
+        self.trailing_silence = trailing_silence
+        self.leading_timeout = leading_timeout
+        self.min_speech = min_speech
+        self.speech_seconds = 0.0
+        self.silence_seconds = 0.0
+        self.elapsed = 0.0
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    @property
+    def heard_speech(self):
+        return self.speech_seconds >= self.min_speech
+
+    # Feed one chunk of PCM; returns True when recording should stop
+    def push(self, chunk):
+        samples = np.concatenate((self._remainder, np.frombuffer(chunk, dtype=np.int16)))
+        frame_len = int(self.rate * self.frame_ms / 1000)
+        usable = len(samples) - len(samples) % frame_len
+        self._remainder = samples[usable:]
+
+        for is_speech in speech_mask(samples[:usable], self.rate, self.frame_ms, self.energy_threshold):
+            self.elapsed += self.frame_seconds
+            if is_speech:
+                self.speech_seconds += self.frame_seconds
+                self.silence_seconds = 0.0
+            elif self.speech_seconds > 0:
+                self.silence_seconds += self.frame_seconds
+
+        if self.heard_speech:
+            return self.silence_seconds >= self.trailing_silence
+        return self.elapsed >= self.leading_timeout
@@ -1,212 +1,506 @@
-import os
 import time
-import wave
-import pyaudio
-import google.generativeai as genai
-from google.generativeai.types import generation_types
-from google.cloud import speech
-from google.cloud import texttospeech
-from google.oauth2 import service_account
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from threading import Thread
-import tempfile
-import matplotlib.pyplot as plt
-import numpy as np
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from threading import Event
 import streamlit as st
-import json
-import playsound
-
-# Load environment variables
-load_dotenv()
-
-# API Keys and Credentials
-gemini_api_key = os.getenv("GEMINI_API_KEY")
-google_api_credentials = 'new.json'
-
-# Setup for Gemini (NLP)
-genai.configure(api_key=gemini_api_key)
-
-generation_config = generation_types.GenerationConfig(
-    temperature=0.7, top_p=0.9, top_k=50, max_output_tokens=1024
-)
-model = genai.GenerativeModel(model_name="gemini-1.5-flash", generation_config=generation_config)
-
-# Setup for Google Speech-to-Text (STT)
-speech_client = speech.SpeechClient(credentials=service_account.Credentials.from_service_account_file(google_api_credentials))
-
-# Setup for Google Text-to-Speech (TTS)
-tts_client = texttospeech.TextToSpeechClient(credentials=service_account.Credentials.from_service_account_file(google_api_credentials))
-
-# Conversation history
-conversation_history = []
-
-# Predefined responses for common queries
-predefined_responses = {
-    "kesepian": "Aku di sini kok, jangan khawatir. Kamu bisa cerita apa saja ke aku.",
-    "aktivitas": "Hari ini kamu bisa berjalan-jalan di sekitar rumah atau membaca buku yang sudah lama ingin kamu baca.",
-    "cuaca": "Hari ini cuacanya cerah, sepertinya waktu yang tepat untuk berjalan-jalan sebentar.",
-    "bosen": "Yuk, kita coba main permainan kata atau kuis singkat supaya bisa menghiburmu.",
-    "belajar": "Bagaimana kalau kita mulai belajar sedikit tentang cara merawat tanaman atau resep masakan baru?",
-    "kesehatan": "Menjaga kesehatan penting. Cobalah melakukan sedikit peregangan atau jalan kaki di sekitar rumah selama 10 menit setiap hari.",
-    "semangat": "Semangat! Kamu sudah melakukan banyak hal hebat. Ingat, setiap hari adalah kesempatan baru untuk merasa lebih baik.",
-    "obat": "Jangan khawatir, saya bisa membantu mengingatkan. Kalau sekarang waktunya minum obat, segera diminum ya. Kalau sudah, beri tahu saya supaya kita tetap teratur.",
-    "capek": "Wah, mungkin tubuh perlu istirahat lebih banyak atau butuh asupan air yang cukup. Coba minum air dulu, dan kalau masih terasa capek, saya sarankan Anda berbicara dengan dokter",
-    "halo": "Hai, Vocacare di sini, ada yang bisa dibantu?"
-}
-
-# Function for recording audio with live visualization
+from tts_cache import synthesize_cached, speech_key
+import phrase_bundle
+from collections import deque
+from itertools import chain
+from audio_io import pcm_to_wav, wav_to_pcm, encode_pcm, spill, play_on_server, audio_format, audio_mime, join_clips, clip_duration, SERVER_PLAYBACK
+from engines import get_stt_engine, get_tts_engine, get_local_tts
+from intents import IntentMatcher
+from memory import get_session_memory
+from answer_cache import answer_cache
+from streaming_reply import split_sentences, pipelined_speech, stream_text
+from clients import get_gemini_model, get_speech_client, get_tts_client
+from recurrence import DEFAULT_TIMEZONE, Rule, reminder_engine
+from scheduler_service import current_user_id
+import metrics
+
+# The Google SDKs, PyAudio and matplotlib are imported inside the functions that need them,
+# and the clients are built lazily in clients.py, so importing this module stays cheap.
+
+# Predefined responses for common queries, with synonyms and priorities, live in intents.json
+intent_matcher = IntentMatcher.from_file()
+predefined_responses = intent_matcher.responses()
+
+# Function for recording audio with live visualization; returns the spoken PCM (None if silent)
 def record_audio_with_visualization(duration=8):
-    with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
-        filename = tmpfile.name  # Use a temporary file for storing audio
-        p = pyaudio.PyAudio()
-        stream = p.open(format=pyaudio.paInt16, channels=1, rate=16000, input=True, frames_per_buffer=1024)
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from vad import Endpointer, trim_silence
+    from audio_device import get_device
 
-        print("Recording...")
-        frames = []
+    print("Recording...")
+    frames = []
 
+    # The lease is released even if plotting fails, so the shared device can go idle again
+    with get_device().lease(preroll=True) as lease:
         # Setup matplotlib for real-time visualization
         plt.ion()
         fig, ax = plt.subplots()
-        x = np.arange(0, 1024)
-        line, = ax.plot(x, np.random.rand(1024), '-')
-        ax.set_ylim(-32768, 32767)
-        ax.set_xlim(0, 1024)
-        plt.title("Audio Input Amplitude")
-        plt.xlabel("Samples")
-        plt.ylabel("Amplitude")
-
-        for _ in range(0, int(16000 / 1024 * duration)):
-            data = stream.read(1024, exception_on_overflow=False)
-            frames.append(data)
-
-            # Update plot with new audio data
-            audio_data = np.frombuffer(data, dtype=np.int16)
-            line.set_ydata(audio_data)
-            fig.canvas.draw()
-            fig.canvas.flush_events()
-
-        plt.ioff()
-        plt.close(fig)
-
-        print("Recording finished.")
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-
-        with wave.open(filename, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-            wf.setframerate(16000)
-            wf.writeframes(b''.join(frames))
-    return filename
-
-# Function for speech-to-text
-def speech_to_text(audio_filename):
-    with open(audio_filename, 'rb') as audio_file:
-        content = audio_file.read()
-
-    audio = speech.RecognitionAudio(content=content)
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+        try:
+            x = np.arange(0, 1024)
+            line, = ax.plot(x, np.random.rand(1024), '-')
+            ax.set_ylim(-32768, 32767)
+            ax.set_xlim(0, 1024)
+            plt.title("Audio Input Amplitude")
+            plt.xlabel("Samples")
+            plt.ylabel("Amplitude")
+
+            # duration is now an upper bound: the endpointer stops once the user falls silent
+            endpointer = Endpointer()
+            for _ in range(0, int(16000 / 1024 * duration)):
+                data = lease.read()
+                if data is None:
+                    break  # input device stopped delivering audio
+                frames.append(data)
+
+                # Update plot with new audio data
+                audio_data = np.frombuffer(data, dtype=np.int16)
+                line.set_ydata(audio_data)
+                fig.canvas.draw()
+                fig.canvas.flush_events()
+
+                if endpointer.push(data):
+                    break
+        finally:
+            plt.ioff()
+            plt.close(fig)
+
+    print("Recording finished.")
+
+    # Only upload the spoken part; nothing to recognize if no speech was heard
+    pcm = trim_silence(b''.join(frames))
+    if not pcm:
+        print("No speech detected.")
+        return None
+
+    spill(pcm_to_wav(pcm), ".wav", prefix="input")
+    return pcm
+
+# Recognition settings shared by the batch and streaming recognizers
+def recognition_config(codec="linear16"):
+    from google.cloud import speech
+    return speech.RecognitionConfig(
+        encoding=speech.RecognitionConfig.AudioEncoding[codec.upper()],
         sample_rate_hertz=16000,
         language_code="id-ID"
     )
 
-    response = speech_client.recognize(config=config, audio=audio)
+# Function for the upload payload and matching config; audio is compressed with STT_CODEC
+def recognition_request(audio, codec=None):
+    content, codec = encode_pcm(wav_to_pcm(bytes(audio)), codec)
+    return content, recognition_config(codec)
+
+# Function for speech-to-text. Takes in-memory audio (raw 16 kHz PCM or WAV bytes);
+# a file path is still accepted for recordings on disk. The engine (Google, local or hedged
+# between them) is chosen by STT_ENGINE.
+def speech_to_text(audio):
+    if not audio:
+        return ""  # recorder found no speech, skip the STT call
+
+    if isinstance(audio, str):
+        with open(audio, 'rb') as audio_file:
+            audio = audio_file.read()
+
+    return get_stt_engine().recognize(wav_to_pcm(bytes(audio)))
+
+# Function for speech-to-text with Google Speech; call_options (timeout=, retry=) go to the API call
+def cloud_speech_to_text(audio, **call_options):
+    from google.cloud import speech
+    with metrics.span("stt_encode"):
+        content, config = recognition_request(audio)
+    audio = speech.RecognitionAudio(content=content)
+
+    metrics.inc("stt_audio_bytes", len(content), mode="recognize")
+    with metrics.span("stt", mode="recognize"):
+        response = get_speech_client().recognize(config=config, audio=audio, **call_options)
     if response.results:
         return response.results[0].alternatives[0].transcript
     else:
         return ""
 
-# Function for generating response based on predefined responses and conversation history
-def generate_response(prompt):
-    conversation_history.append(f"User: {prompt}")
-    context = "\n".join(conversation_history[-5:])
+# Function for speech-to-text of recordings longer than a minute (Google's limit for recognize)
+def cloud_long_speech_to_text(audio, timeout=600):
+    from google.cloud import speech
+    content, config = recognition_request(audio)
+    operation = get_speech_client().long_running_recognize(config=config, audio=speech.RecognitionAudio(content=content))
+    with metrics.span("stt", mode="long_running"):
+        response = operation.result(timeout=timeout)
+    return " ".join(result.alternatives[0].transcript.strip() for result in response.results if result.alternatives)
+
+# Function for yielding raw PCM chunks from the microphone until the user stops talking.
+# Leading silence is held back (apart from a short pre-roll) so it is never uploaded.
+def microphone_chunks(duration=8, stop_event=None, preroll_chunks=4):
+    from vad import Endpointer
+    from audio_device import get_device
+
+    device = get_device()  # shared, already-open input stream with its own chunk size
+    lease = device.lease()
+    endpointer = Endpointer()
+    preroll = deque(maxlen=preroll_chunks)
+    try:
+        for _ in range(0, int(16000 / device.chunk * duration)):
+            if stop_event is not None and stop_event.is_set():
+                break
+            data = lease.read()
+            if data is None:
+                break  # input device stopped delivering audio
+            done = endpointer.push(data)
+            if endpointer.speech_seconds > 0:
+                while preroll:
+                    yield preroll.popleft()
+                yield data
+            else:
+                preroll.append(data)
+            if done:
+                break
+    finally:
+        lease.close()
+
+# Function for streaming speech-to-text: returns as soon as the service marks a result final.
+# on_interim(transcript, stability) is called for each partial result before that.
+def streaming_speech_to_text(audio_chunks, client=None, stop_event=None, on_interim=None):
+    from google.cloud import speech
+    client = client or get_speech_client()
+    streaming_config = speech.StreamingRecognitionConfig(
+        config=recognition_config(),
+        interim_results=True,
+        single_utterance=True
+    )
+    stop_event = stop_event or Event()
 
-    # Check if the user is asking about predefined topics
-    for keyword, response in predefined_responses.items():
-        if keyword in prompt.lower():
-            conversation_history.append(f"Vocacare: {response}")
-            return response
+    # Don't open a recognition stream at all if the capture produced no speech
+    audio_chunks = iter(audio_chunks)
+    first_chunk = next(audio_chunks, None)
+    if first_chunk is None:
+        return ""
+    audio_chunks = chain([first_chunk], audio_chunks)
+
+    last_audio = [time.perf_counter()]
+
+    def requests():
+        for chunk in audio_chunks:
+            if stop_event.is_set():
+                break
+            metrics.inc("stt_audio_bytes", len(chunk), mode="streaming")
+            last_audio[0] = time.perf_counter()
+            yield speech.StreamingRecognizeRequest(audio_content=chunk)
+
+    try:
+        responses = client.streaming_recognize(config=streaming_config, requests=requests())
+        for response in responses:
+            for result in response.results:
+                if result.is_final and result.alternatives:
+                    # How long the final transcript took after the last audio was sent
+                    metrics.observe("stt", time.perf_counter() - last_audio[0], mode="streaming")
+                    return result.alternatives[0].transcript
+                if on_interim is not None and result.alternatives:
+                    on_interim(result.alternatives[0].transcript, result.stability)
+        return ""
+    finally:
+        # Stop feeding audio (and release the microphone) once we have the transcript
+        stop_event.set()
+
+# Function for recording and recognizing in one pass while the user talks
+def listen_streaming(duration=8):
+    stop_event = Event()
+    return streaming_speech_to_text(microphone_chunks(duration, stop_event=stop_event), stop_event=stop_event)
+
+# Function for a streaming turn that prepares the reply from partial transcripts while the user
+# talks; returns (transcript, answer, audio, whether the speculation was used)
+def listen_speculative(duration=8, memory=None):
+    from speculation import Speculator
+    speculator = Speculator(memory or get_session_memory())
+    stop_event = Event()
+    transcript = streaming_speech_to_text(microphone_chunks(duration, stop_event=stop_event),
+                                          stop_event=stop_event, on_interim=speculator.on_interim)
+    return (transcript, *speculator.resolve(transcript))
+
+# Function for the part of a reply that needs no Gemini call. Records the user turn and returns
+# (answer or None, prompt context, context before this prompt); answer is set for predefined topics and cache hits.
+def prepare_response(prompt, memory):
+    history = memory.context()
+    memory.add("User", prompt)
+    context = memory.context()
 
-    # If the prompt is not predefined, generate a casual response using the NLP model
-    casual_prompt = f"Anggap kamu sebagai teman dekat sekaligus asisten lansia. Jawab pertanyaan berikut dengan gaya kasual, ramah, dan hangat: {context}\nVocacare:"
-    response = model.generate_content([casual_prompt])
-    answer = response.text.strip()
-    conversation_history.append(f"Vocacare: {answer}")
+    # Check if the user is asking about predefined topics
+    with metrics.span("intent_match"):
+        intent = intent_matcher.match(prompt)
+    if intent:
+        metrics.inc("responses", source="intent")
+        memory.add("Vocacare", intent["response"])
+        return intent["response"], context, history
+
+    # Repeated questions are answered from the cache without calling Gemini
+    answer = answer_cache.get(prompt, history, memory.user_id)
+    if answer is not None:
+        metrics.inc("responses", source="cache")
+        memory.add("Vocacare", answer)
+    return answer, context, history
+
+# Function for recording a freshly generated Gemini answer
+def finish_response(prompt, answer, history, memory):
+    answer_cache.put(prompt, answer, history, memory.user_id)
+    memory.add("Vocacare", answer)
     return answer
 
-# Function for text-to-speech
-def text_to_speech(text, filename="output.mp3"):
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-    voice = texttospeech.VoiceSelectionParams(language_code="id-ID", ssml_gender=texttospeech.SsmlVoiceGender.FEMALE)
-    audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+# Function for generating response based on predefined responses and conversation history
+# (memory defaults to the current Streamlit session's bounded history)
+def generate_response(prompt, memory=None):
+    memory = memory or get_session_memory()
+    answer, context, history = prepare_response(prompt, memory)
+    if answer is not None:
+        return answer
 
-    response = tts_client.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
+    # If the prompt is not predefined, generate a casual response using the NLP model
+    metrics.inc("responses", source="llm")
+    with metrics.span("llm", mode="batch"):
+        response = get_gemini_model().generate_content([casual_prompt(context)])
+    return finish_response(prompt, response.text.strip(), history, memory)
+
+# Function for the prompt sent to Gemini for non-predefined questions
+def casual_prompt(context):
+    return f"Anggap kamu sebagai teman dekat sekaligus asisten lansia. Jawab pertanyaan berikut dengan gaya kasual, ramah, dan hangat: {context}\nVocacare:"
+
+# Function for generating a response as a stream of text chunks (one chunk for predefined replies).
+# The session memory is looked up here, on the script thread: the chunks may be consumed on
+# another thread, where st.session_state is not available.
+def generate_response_stream(prompt, memory=None, llm=None):
+    return _response_chunks(prompt, memory or get_session_memory(), llm)
+
+def _response_chunks(prompt, memory, llm):
+    answer, context, history = prepare_response(prompt, memory)
+    if answer is not None:
+        yield answer
+        return
+
+    metrics.inc("responses", source="llm")
+    parts = []
+    start = time.perf_counter()
+    for text in stream_text(llm or get_gemini_model(), casual_prompt(context)):
+        if not parts:
+            metrics.observe("llm_first_token", time.perf_counter() - start)
+        parts.append(text)
+        yield text
+    metrics.observe("llm", time.perf_counter() - start, mode="stream")
+    finish_response(prompt, "".join(parts).strip(), history, memory)
+
+# Function for speaking a reply while it is still being generated: yields (sentence, mp3 bytes)
+# in order, with each sentence synthesized concurrently as soon as Gemini finishes it
+def speak_response_stream(prompt, memory=None, llm=None, synthesize=None):
+    # generate_response_stream resolves the session memory now, before pipelined_speech's producer thread runs it
+    sentences = split_sentences(generate_response_stream(prompt, memory=memory, llm=llm))
+    return pipelined_speech(sentences, synthesize or synthesize_audio)
+
+# Function for showing a speak_response_stream reply while it is generated: the text grows sentence by
+# sentence and each sentence's clip goes to the browser as soon as it is ready. Browser players don't
+# queue, so each clip is sent (autoplaying) once the previous one should have finished. With server
+# playback the server speakers play the sentences instead and the browser gets the whole reply to replay.
+def show_streamed_reply(stream, server_playback=False, label="**Balasan Vocacare:**"):
+    reply_placeholder = st.empty()
+    sentences, clips = [], []
+    free_at = 0.0  # when the browser should be done with the clip it is playing
+    for sentence, audio in stream:
+        if not server_playback:
+            time.sleep(max(0.0, free_at - time.monotonic()))
+        sentences.append(sentence)
+        clips.append(audio)
+        reply_placeholder.write(f"{label} {' '.join(sentences)}")
+        if server_playback:
+            with metrics.span("playback"):
+                play_on_server(audio, True)
+        elif audio:
+            # The numbered alt text tells the players apart, as a repeated sentence gives an identical clip
+            st.audio(bytes(audio), format=audio_mime(audio), autoplay=True, alt=f"Balasan Vocacare, kalimat {len(clips)}")
+            free_at = time.monotonic() + clip_duration(audio)
+    if server_playback:
+        full_reply = join_clips(clips)
+        # Mixed cloud and local voices can't be joined: one player per clip
+        for clip in ([full_reply] if full_reply else clips):
+            st.audio(clip, format=audio_mime(clip))
+    return " ".join(sentences)
+
+# Voice and audio settings shared by text_to_speech and the phrase bundle builder
+def voice_params():
+    from google.cloud import texttospeech
+    return texttospeech.VoiceSelectionParams(language_code="id-ID", ssml_gender=texttospeech.SsmlVoiceGender.FEMALE)
+
+def audio_params():
+    from google.cloud import texttospeech
+    return texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+
+# Function for synthesizing audio bytes: phrase bundle first, then the engine chosen by
+# TTS_ENGINE (Google through the TTS cache, the local voice, or hedged between them)
+def synthesize_audio(text):
+    from google.cloud import texttospeech
+    synthesis_input = texttospeech.SynthesisInput(text=text)
 
-    with open(filename, 'wb') as out:
-        out.write(response.audio_content)
+    audio_content = phrase_bundle.lookup(speech_key(synthesis_input, voice_params(), audio_params()))
+    if audio_content is not None:
+        metrics.inc("tts_bundle_hits")
+        return audio_content
+    return get_tts_engine().synthesize(text)
 
-    print(f"Audio saved as {filename}")
-    return filename
+# Function for synthesizing with Google Text-to-Speech (served from the cache when possible);
+# call_options (timeout=, retry=) go to the API call
+def cloud_synthesize(text, **call_options):
+    from google.cloud import texttospeech
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    with metrics.span("tts"):
+        return synthesize_cached(get_tts_client(), synthesis_input, voice_params(), audio_params(), **call_options)
+
+# Function for text-to-speech; returns MP3 bytes (WAV when the local voice answered)
+def text_to_speech(text):
+    return text_to_speech_parts([text])
+
+# Function for text-to-speech of several phrases played back to back
+def text_to_speech_parts(parts):
+    audio_content = join_clips([synthesize_audio(part) for part in parts])
+    if audio_content is None:
+        # Some phrases came from the local voice: say all of them with it, so they join cleanly
+        audio_content = join_clips([get_local_tts().synthesize(part) for part in parts])
+    spill(audio_content, f".{audio_format(audio_content)}", prefix="tts")
+    return audio_content
 
 # Streamlit UI to interact with voicebot
 def voicebot_interaction():
     st.title("Vocacare Voicebot")
     st.write("Selamat datang di Vocacare, teman berbicara Anda!")
     
+    streaming = st.checkbox("Streaming recognition", value=True)
+    streaming_reply = st.checkbox("Streaming reply", value=True)
+    concurrent = st.checkbox("Concurrent pipeline (asyncio, used when both streaming modes are off)", value=True)
+
     if st.button('Start Voice Interaction'):
         st.write("Recording...")
-        audio_filename = record_audio_with_visualization()
+        if concurrent and not streaming and not streaming_reply:
+            show_async_turn(record_audio_with_visualization())
+            return
+        if streaming:
+            # Recognize while the user talks instead of recording a fixed 8 seconds first
+            user_input = listen_streaming()
+        else:
+            pcm = record_audio_with_visualization()
 
-        st.write("Processing...")
-        user_input = speech_to_text(audio_filename)
+            st.write("Processing...")
+            user_input = speech_to_text(pcm)
         
         if user_input:
             st.write(f"You said: {user_input}")
-            response_text = generate_response(user_input)
-            st.write(f"Vocacare response: {response_text}")
-            
-            # Generate TTS and play audio in Streamlit
-            audio_file = text_to_speech(response_text, filename="response.mp3")
-            st.audio(audio_file, format="audio/mp3")
-
-            reminder_message = send_reminders()
-            if reminder_message:
+            if streaming_reply:
+                # Shown and spoken sentence by sentence while Gemini is still generating
+                show_streamed_reply(speak_response_stream(user_input), SERVER_PLAYBACK, label="Vocacare response:")
+            else:
+                response_text = generate_response(user_input)
+                st.write(f"Vocacare response: {response_text}")
+
+                # Generate TTS and play audio in Streamlit
+                response_audio = text_to_speech(response_text)
+                st.audio(response_audio, format=audio_mime(response_audio))
+
+            parts = reminder_parts()
+            if parts:
+                reminder_message = " ".join(parts)
                 st.write(f"Reminder: {reminder_message}")
-                reminder_audio = text_to_speech(reminder_message, filename="reminder.mp3")
-                st.audio(reminder_audio, format="audio/mp3")
+                # The fixed reminder text comes from the phrase bundle, only the time announcement is synthesized
+                reminder_audio = text_to_speech_parts(parts)
+                st.audio(reminder_audio, format=audio_mime(reminder_audio))
         else:
             st.write("Tidak ada suara yang terdeteksi. Silakan coba lagi.")
 
-# Function to get Jakarta time
-def get_current_time():
-    return datetime.utcnow() + timedelta(hours=7)
+# Function for running a whole turn on the shared event loop (reminder audio overlaps the reply)
+def show_async_turn(pcm):
+    import asyncio
+    from async_pipeline import get_runner
+
+    st.write("Processing...")
+    try:
+        turn = get_runner().run_turn(pcm)
+    except asyncio.TimeoutError:
+        st.warning("Layanan sedang lambat dan belum menjawab. Silakan coba lagi.")
+        return
+    if turn["transcript"]:
+        st.write(f"You said: {turn['transcript']}")
+        st.write(f"Vocacare response: {turn['response']}")
+        st.audio(turn["audio"], format="audio/mp3")
+    else:
+        st.write("Tidak ada suara yang terdeteksi. Silakan coba lagi.")
+    if turn["reminder"]:
+        st.write(f"Reminder: {turn['reminder']}")
+        st.audio(turn["reminder_audio"], format="audio/mp3")
+
+# Function for the session user's timezone (defaults to VOCACARE_TIMEZONE, Jakarta time)
+def user_timezone():
+    try:
+        return st.session_state.get("timezone", DEFAULT_TIMEZONE)
+    except Exception:
+        return DEFAULT_TIMEZONE
+
+# Function to get the current time in the user's timezone
+def get_current_time(timezone=None):
+    return datetime.now(ZoneInfo(timezone or user_timezone()))
+
+# Fixed daily reminders keyed by (hour, minute), in the user's local time
+daily_reminders = {
+    (23, 10): "Selamat pagi! Jangan lupa sarapan ya.",
+    (12, 00): "Waktunya makan siang! Yuk, makan yang sehat.",
+    (18, 00): "Waktunya minum obat! Jangan lupa ya.",
+    (19, 00): "Selamat makan malam! Nikmati hidangan malam ini.",
+}
+hourly_reminder = "Jangan lupa minum air putih agar tetap terhidrasi."
+
+# Function for registering the built-in reminders of a user with the recurrence engine
+def ensure_builtin_reminders(user_id, timezone):
+    # Rules start from the user's last turn (at most the catch-up window ago), so reminders
+    # that came due before their first turn, during the current minute or before a timezone
+    # change are still announced, and nothing announced already is repeated
+    now = datetime.now(ZoneInfo(timezone))
+    since = now - reminder_engine.catch_up_window
+    last_taken = reminder_engine.last_taken(user_id)
+    if last_taken is not None and last_taken > since:
+        since = last_taken
+    rules = [
+        Rule(f"{user_id}:daily:{hour:02d}{minute:02d}", user_id, message, "daily",
+             hour=hour, minute=minute, timezone=timezone, priority=10 if "obat" in message else 0)
+        for (hour, minute), message in daily_reminders.items()
+    ]
+    rules.append(Rule(f"{user_id}:hydration", user_id, hourly_reminder, "every", every_hours=2, timezone=timezone))
+    for rule in rules:
+        existing = reminder_engine.get(rule.rule_id)
+        if existing is None or existing.timezone != timezone:
+            reminder_engine.add(rule, now=since)
+
+# Function for the due reminders as (time announcement, message, ...), or None. Reminders
+# that came due since the user's last turn are caught up instead of being missed.
+def reminder_parts(user_id=None, timezone=None):
+    timezone = timezone or user_timezone()
+    return reminder_announcement(take_reminders(user_id, timezone), timezone)
+
+# Function for taking a user's due reminders; put them back with reminder_engine.restore
+# if they can't be delivered
+def take_reminders(user_id=None, timezone=None):
+    user_id = user_id or current_user_id()
+    ensure_builtin_reminders(user_id, timezone or user_timezone())
+    return reminder_engine.take(user_id)
+
+# Function for the announcement of taken reminders as (time announcement, message, ...), or None
+def reminder_announcement(due, timezone=None):
+    if not due:
+        return None
+
+    current_time = get_current_time(timezone)
+    messages = list(dict.fromkeys(rule.message for _, rule in due))
+    time_announcement = f"Eh, sudah jam {current_time.strftime('%H:%M:%S')}."
+    return (time_announcement, *messages)
 
 # Function for reminders with current time announcement
 def send_reminders():
-    current_time = get_current_time()
-    reminders = {
-        (23, 10): "Selamat pagi! Jangan lupa sarapan ya.",
-        (12, 00): "Waktunya makan siang! Yuk, makan yang sehat.",
-        (18, 00): "Waktunya minum obat! Jangan lupa ya.",
-        (19, 00): "Selamat makan malam! Nikmati hidangan malam ini.",
-    }
-    hourly_reminder = "Jangan lupa minum air putih agar tetap terhidrasi."
-
-    reminder_message = ""
-    for (hour, minute), message in reminders.items():
-        if current_time.hour == hour and current_time.minute == minute:
-            reminder_message = message
-            break
-
-    if current_time.minute == 0 and current_time.hour % 2 == 0:
-        reminder_message = hourly_reminder
-
-    if reminder_message:
-        time_announcement = f"Eh, sudah jam {current_time.strftime('%H:%M:%S')}."
-        return f"{time_announcement} {reminder_message}"
+    parts = reminder_parts()
+    if parts:
+        return " ".join(parts)
 
     return ""
 